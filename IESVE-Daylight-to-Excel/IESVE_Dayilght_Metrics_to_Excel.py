@@ -1,13 +1,82 @@
 import os
 import re
-import tkinter as tk
-from tkinter import filedialog, simpledialog, messagebox, Radiobutton, Label, Button, StringVar, LEFT, RIGHT, W
-import pandas as pd
+import csv
+import sys
+import json
+import mmap
+import time
+import sqlite3
+import argparse
+import contextlib
+import threading
+import multiprocessing
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+# tkinter is imported inside the GUI functions only, so the command-line mode
+# runs on machines without a display (or without Tcl/Tk at all).
+# NumPy, pandas and openpyxl are imported where they are used, so the first dialog
+# (and every parse worker process) starts without loading them; see FolderScan.
+
+# --- Parsing Engine Settings ---
+
+MAX_WORKERS_WINDOWS = 61 # ProcessPoolExecutor limit on Windows
+MIN_FILES_FOR_POOL = 8 # Below this, starting worker processes costs more than it saves
+TASKS_PER_WORKER = 4 # Chunks handed to each worker; keeps load balanced without tiny tasks
+
+# --- .wpd Parsing Patterns ---
+
+READ_BUFFER_SIZE = 1024 * 1024
+PARSER_BACKENDS = ("auto", "stream", "mmap")
+MMAP_MIN_FILE_SIZE = 16 * 1024 * 1024 # "auto" memory-maps files at least this large
+ZONE_RE = re.compile(r"\[Zone\]\s*\[(.*?)\]\s*(.*)")
+METRIC_DESC_RE = re.compile(r"\[([A-Za-z0-9\s][^\]]*)\]\s*(.*)")
+KNOWN_WPD_TAGS = frozenset(["RADIANCE", "Date", "Geometry", "Location", "Zone", "Stat", "Sim", "XYZ", "NxNy", "Period", "Data", "MMA"])
+
+# --- Export Settings ---
+
+AREA_TYPES = ("Full", "AOI")
+ALL_METRICS = "All metrics" # Dialog choice: export every metric found in the folder
+BOTH_AREAS = "Both" # Dialog choice: export Full and AOI stats
+STATS_COLUMNS = ['Room ID', 'Room Name', 'File Metric Type', 'Area Type', 'Metric Description', 'Min', 'Max', 'Average', 'Parse Status', 'MMA Values']
+SHEET_NAME_LIMIT = 31 # Excel sheet name limit
+COLUMNAR_FORMATS = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow", ".csv": "csv"}
+COLUMNAR_BATCH_ROWS = 50000 # Rows buffered before a Parquet row group / Arrow record batch is written
+
+# --- Grid Analytics Settings ---
+
+GridOptions = namedtuple("GridOptions", ["thresholds", "percentiles"])
+DEFAULT_GRID_THRESHOLDS = (2.0,) # e.g. DF >= 2%
+DEFAULT_GRID_PERCENTILES = (10, 50, 90)
+
+# --- Parse Cache Settings ---
+
+PARSE_CACHE_FILENAME = ".wpd_parse_cache.sqlite" # Sidecar stored in the results folder
+PARSE_CACHE_VERSION = 3 # Bump whenever parse_wpd_file output changes, to discard stale entries
+
+# --- Watch Mode Settings ---
+
+WATCH_POLL_SECONDS = 2.0 # How often the folder (or the change notifications) are checked
+WATCH_SETTLE_SECONDS = 5.0 # A file must stop changing for this long before it is parsed
+WATCH_RESCAN_SECONDS = 60.0 # Safety re-listing when native notifications are in use
+
+# --- Run Report Settings ---
+
+REPORT_FORMATS = (".json", ".csv")
+GUI_REPORT_SUFFIX = ".report.json" # GUI runs write <workbook>.report.json next to the workbook
+REPORT_SLOWEST_FILES = 10 # Files listed in the slowest-files summary
+REPORT_FILE_COLUMNS = ['File', 'Metric', 'Size (bytes)', 'Parse Seconds', 'Blocks', 'Status', 'Issues', 'Cached']
+
+# --- Design Option Comparison Settings ---
+
+COMPARE_KEY_COLUMNS = ['Room ID', 'Metric Description'] # Rows of different options are matched on these
 
 # --- GUI Functions ---
 
 def get_radiance_folder():
     """Opens a dialog to ask the user for the Radiance results folder."""
+    import tkinter as tk
+    from tkinter import filedialog, messagebox
     root = tk.Tk()
     root.withdraw()
     folder_path = filedialog.askdirectory(title="Select Radiance Results Folder")
@@ -18,7 +87,9 @@ def get_radiance_folder():
     return folder_path
 
 def select_metric_from_list(metric_types):
-    """Presents a dialog for the user to select a metric type."""
+    """Presents a dialog for the user to select a metric type (or all of them)."""
+    import tkinter as tk
+    from tkinter import messagebox, Radiobutton, Label, Button, StringVar, LEFT, RIGHT, W
     if not metric_types:
         messagebox.showinfo("Info", "No .wpd files or metric types found in the folder.")
         return None
@@ -35,6 +106,8 @@ def select_metric_from_list(metric_types):
     for metric_type in metric_types:
         rb = Radiobutton(dialog_root, text=metric_type, variable=var, value=metric_type)
         rb.pack(anchor=W, padx=20)
+    if len(metric_types) > 1:
+        Radiobutton(dialog_root, text=f"{ALL_METRICS} (one sheet each)", variable=var, value=ALL_METRICS).pack(anchor=W, padx=20, pady=(5, 0))
 
     selected_metric = None
     def on_ok():
@@ -54,10 +127,12 @@ def select_metric_from_list(metric_types):
     return selected_metric
 
 def select_area_type():
-    """Presents a dialog for the user to select Full Area or AOI."""
+    """Presents a dialog for the user to select Full Area, AOI or both."""
+    import tkinter as tk
+    from tkinter import messagebox, Radiobutton, Label, Button, StringVar, LEFT, RIGHT, W
     dialog_root = tk.Tk()
     dialog_root.title("Select Area Type")
-    dialog_root.geometry("300x200")
+    dialog_root.geometry("300x230")
 
     Label(dialog_root, text="Select statistics to extract:", justify=LEFT).pack(pady=10, padx=20, anchor=W)
     Label(dialog_root, text="(AOI stats depend on simulation setup)", font=('Helvetica', 8), justify=LEFT).pack(padx=20, anchor=W)
@@ -67,6 +142,7 @@ def select_area_type():
 
     Radiobutton(dialog_root, text="Full Area", variable=var, value="Full").pack(anchor=W, padx=40, pady=5)
     Radiobutton(dialog_root, text="Area Of Interest (AOI)", variable=var, value="AOI").pack(anchor=W, padx=40, pady=5)
+    Radiobutton(dialog_root, text="Both (one sheet each)", variable=var, value=BOTH_AREAS).pack(anchor=W, padx=40, pady=5)
 
     selected_area = None
     def on_ok():
@@ -87,140 +163,1039 @@ def select_area_type():
 
 # --- File Processing Functions ---
 
+def metric_type_from_filename(filename):
+    """Returns the metric suffix of a .wpd filename (final underscore-separated token), or None."""
+    parts = os.path.splitext(os.path.basename(filename))[0].split('_')
+    if len(parts) > 1:
+        return parts[-1]
+    return None
+
+def metric_types_from_filenames(filenames):
+    """Unique metric types of the .wpd files among filenames, sorted."""
+    metric_types = set()
+    for filename in filenames:
+        if filename.endswith(".wpd"):
+            metric_type = metric_type_from_filename(filename)
+            if metric_type:
+                metric_types.add(metric_type)
+    return sorted(metric_types)
+
 def get_available_metrics_from_files(folder_path):
     """Scans .wpd files in the folder to find unique metric types from filenames."""
-    metric_types = set()
     if not os.path.isdir(folder_path):
-        return list(metric_types)
+        return []
+    return metric_types_from_filenames(os.listdir(folder_path))
 
-    for filename in os.listdir(folder_path):
-        if filename.endswith(".wpd"):
-            parts = os.path.splitext(filename)[0].split('_')
-            if len(parts) > 1:
-                metric_types.add(parts[-1])
-    return sorted(list(metric_types))
+class FolderScan(threading.Thread):
+    """
+    Lists a results folder's .wpd files once, on a background thread: the metric dialog is
+    built from the listing (metric_types) and the export reuses it (file_paths). After the
+    listing, the files are stat'ed and the Excel engine is loaded while the metric and area
+    dialogs are open, so both are ready when the export starts (slow on network shares).
+    """
 
-def parse_wpd_file(file_path, expected_metric_type_from_filename, area_choice):
+    def __init__(self, folder_path, grid_stats=False):
+        super().__init__(daemon=True)
+        self.folder_path = folder_path
+        self.grid_stats = grid_stats
+        self.wpd_files = []
+        self.wpd_metric_types = []
+        self.error = None
+        self.listed = threading.Event() # Set once wpd_files and wpd_metric_types are complete (or error is set)
+
+    def run(self):
+        wpd_entries = []
+        try:
+            # os.listdir order, as used by collect_stats, so row order is unchanged
+            with os.scandir(self.folder_path) as entries:
+                wpd_entries = [entry for entry in entries if entry.name.endswith('.wpd')]
+            self.wpd_files = [entry.path for entry in wpd_entries]
+            # Done here, before the stat calls compete with the main thread for the GIL
+            self.wpd_metric_types = metric_types_from_filenames(entry.name for entry in wpd_entries)
+        except OSError as e:
+            self.error = e
+        self.listed.set()
+        for entry in wpd_entries:
+            try:
+                entry.stat() # Warms the file metadata the parse cache checks later
+            except OSError:
+                pass
+        try:
+            import openpyxl.cell, openpyxl.styles # noqa: F401 (preload only)
+            if self.grid_stats:
+                import numpy # noqa: F401
+        except ImportError:
+            pass # Reported where the export actually needs them
+
+    def metric_types(self):
+        """Waits for the listing only (not the stat calls or preloads) and returns its metric types."""
+        self.listed.wait()
+        if self.error is not None:
+            raise self.error
+        return self.wpd_metric_types
+
+    def file_paths(self, metric_types):
+        """Waits for the scan and returns the .wpd paths for the given metrics."""
+        self.join()
+        if self.error is not None:
+            raise self.error
+        suffixes = tuple(f"_{metric_type}.wpd" for metric_type in metric_types)
+        return [file_path for file_path in self.wpd_files if file_path.endswith(suffixes)]
+
+class _WpdBlockScanner:
     """
-    Parses a single .wpd file, extracting stats for the chosen area type (Full/AOI).
+    State machine shared by the .wpd parser backends. It is fed every line that contains a '['
+    (stripped), plus the raw [Data] payload when grid analytics are on, and collects
+    (metric_description, mma_line, grid_stats) tuples for each [Sim] block closed by an [MMA] line.
     """
-    results = []
-    room_id = "Unknown"
-    room_name_from_file = "Unknown"
 
-    base_filename = os.path.basename(file_path)
-    filename_parts = os.path.splitext(base_filename)[0].split('_')
-    if len(filename_parts) > 0:
-        room_id_from_filename = filename_parts[0]
+    def __init__(self, grid_options=None):
+        self.grid_options = grid_options
+        self.room_id = None
+        self.room_name = "Unknown"
+        self.blocks = []
+        self.metric_description = 'N/A'
+        self.in_sim_block = False
+        self.grid_shape = None
+        self.data_lines = [] # [Data] rows of the current block (grid analytics only)
+        self.collecting = False
 
-    try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
+    def add_data(self, text):
+        """Adds grid payload for the current [Data] section."""
+        self.data_lines.append(text)
 
-        current_sim_block_data = {}
-        in_sim_block = False
+    def tag_line(self, line):
+        """Processes one stripped line containing a tag."""
+        self.collecting = False
 
-        # Get Zone info
-        for line in lines:
-            line = line.strip()
-            zone_match = re.match(r"\[Zone\]\s*\[(.*?)\]\s*(.*)", line)
+        # Get Zone info (first [Zone] line in the file wins, wherever it appears)
+        if self.room_id is None:
+            zone_match = ZONE_RE.match(line)
             if zone_match:
-                room_id = zone_match.group(1)
-                room_name_from_file = zone_match.group(2).strip()
-                break
-        if room_id == "Unknown":
-            room_id = room_id_from_filename
+                self.room_id = zone_match.group(1)
+                self.room_name = zone_match.group(2).strip()
 
         # Process Sim blocks
-        for line in lines:
-            line = line.strip()
-
-            if line.startswith("[Sim]"):
-                in_sim_block = True
-                current_sim_block_data = {
-                    'Room ID': room_id,
-                    'Room Name': room_name_from_file,
-                    'File Metric Type': expected_metric_type_from_filename,
-                    'Area Type': area_choice, # Store the requested type
-                    'Metric Description': 'N/A',
-                    'Min': 'N/A',
-                    'Max': 'N/A',
-                    'Average': 'N/A',
-                    'MMA Values': 'N/A',
-                    'Parse Status': 'OK' # To track issues like missing AOI
-                }
+        if line.startswith("[Sim]"):
+            self.in_sim_block = True
+            self.metric_description = 'N/A'
+            self.grid_shape = None
+            self.data_lines = []
+            return
+
+        if not self.in_sim_block:
+            return
+
+        if self.grid_options is not None:
+            if line.startswith("[NxNy]"):
+                self.grid_shape = _parse_grid_shape(line)
+            elif line.startswith("[Data]"):
+                self.collecting = True
+                self.data_lines.append(line[len("[Data]"):])
+
+        metric_desc_match = METRIC_DESC_RE.match(line)
+        if metric_desc_match:
+            tag_content = metric_desc_match.group(1)
+            description_content = metric_desc_match.group(2).strip()
+            # Exclude known structural tags
+            if tag_content not in KNOWN_WPD_TAGS and description_content:
+                self.metric_description = f"[{tag_content}] {description_content}"
+
+        if line.startswith("[MMA]"):
+            grid_stats = None
+            if self.grid_options is not None:
+                grid_stats = compute_grid_stats(self.data_lines, self.grid_shape, self.grid_options)
+            self.blocks.append((self.metric_description, line, grid_stats))
+            self.in_sim_block = False
+            self.data_lines = []
+
+def _scan_wpd_blocks_stream(file_path, scanner):
+    """Text backend: streams the file line by line; grid rows are skipped without stripping."""
+    with open(file_path, 'r', encoding='utf-8', errors='ignore', buffering=READ_BUFFER_SIZE) as f:
+        for line in f:
+            # Grid payload ([Data] rows) never contains tags
+            if '[' not in line:
+                if scanner.collecting:
+                    scanner.add_data(line)
                 continue
+            scanner.tag_line(line.strip())
+
+def _scan_wpd_blocks_mmap(file_path, scanner):
+    """
+    Byte backend: memory-maps the file and jumps between '[' characters with mmap.find,
+    decoding only the tag lines. Grid rows are never turned into Python strings unless
+    grid analytics need them.
+    """
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return # mmap cannot map an empty file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = 0 # Always at the start of a line
+            # Line breaks are \n, \r\n or a bare \r, as in the stream backend's text mode.
+            # Most files have no \r at all, and for those the \r searches are skipped.
+            any_cr = mm.find(b'\r') != -1
+            while pos < size:
+                bracket = mm.find(b'[', pos)
+                if bracket == -1:
+                    if scanner.collecting:
+                        scanner.add_data(mm[pos:].decode('utf-8', errors='ignore'))
+                    break
+                newline = mm.rfind(b'\n', pos, bracket)
+                if any_cr:
+                    newline = max(newline, mm.rfind(b'\r', newline + 1 if newline != -1 else pos, bracket))
+                line_start = newline + 1 if newline != -1 else pos
+                if scanner.collecting and line_start > pos:
+                    scanner.add_data(mm[pos:line_start].decode('utf-8', errors='ignore'))
+                line_end = mm.find(b'\n', bracket)
+                if any_cr:
+                    carriage_return = mm.find(b'\r', bracket, size if line_end == -1 else line_end)
+                    if carriage_return != -1:
+                        line_end = carriage_return
+                if line_end == -1:
+                    line_end = size
+                scanner.tag_line(mm[line_start:line_end].decode('utf-8', errors='ignore').strip())
+                pos = line_end + (2 if any_cr and mm[line_end:line_end + 2] == b'\r\n' else 1)
+
+def _scan_wpd_blocks(file_path, grid_options=None, backend="auto"):
+    """
+    Reads a .wpd file once and returns (room_id, room_name, blocks), where each block is a
+    (metric_description, mma_line, grid_stats) tuple for a [Sim] block closed by an [MMA] line.
+    backend is "stream" (text mode), "mmap" (byte-level search) or "auto", which memory-maps
+    files of MMAP_MIN_FILE_SIZE bytes or more. Both backends produce the same blocks.
+    Sensor grid rows are not kept in memory unless grid_options is given, in which case each
+    block's [Data] rows are held only until its grid stats are computed.
+    """
+    if backend == "auto":
+        backend = "mmap" if os.path.getsize(file_path) >= MMAP_MIN_FILE_SIZE else "stream"
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend}")
+
+    scanner = _WpdBlockScanner(grid_options)
+    if backend == "mmap":
+        _scan_wpd_blocks_mmap(file_path, scanner)
+    else:
+        _scan_wpd_blocks_stream(file_path, scanner)
+    return scanner.room_id, scanner.room_name, scanner.blocks
+
+def _parse_grid_shape(line):
+    """Returns (nx, ny) from an [NxNy] line, or None if it cannot be read."""
+    parts = line[len("[NxNy]"):].split()
+    try:
+        return int(parts[0]), int(parts[1])
+    except (ValueError, IndexError):
+        return None
+
+def grid_stats_columns(grid_options):
+    """Column names for the grid analytics stage, in export order."""
+    return (['Grid Points', 'Uniformity (Min/Avg)', 'Diversity (Min/Max)']
+            + [f"% Area >= {threshold:g}" for threshold in grid_options.thresholds]
+            + [f"P{percentile:g}" for percentile in grid_options.percentiles])
+
+def compute_grid_stats(data_lines, grid_shape, grid_options):
+    """
+    Loads a block's [Data] rows into a NumPy array and computes uniformity, percent-of-area
+    above each threshold and percentiles without per-point Python loops.
+    If [NxNy] says there are Nx*Ny points but [Data] holds a multiple of that, each point is
+    taken to be a row whose last column is the value. Returns None if there is no grid data.
+    """
+    import numpy as np
+
+    try:
+        values = np.array(" ".join(data_lines).split(), dtype=float)
+    except ValueError:
+        print("Warning: Could not read [Data] grid values; grid stats skipped for this block")
+        return None
+    if values.size == 0:
+        return None
+    if grid_shape is not None:
+        point_count = grid_shape[0] * grid_shape[1]
+        if point_count and values.size > point_count and values.size % point_count == 0:
+            values = values.reshape(point_count, -1)[:, -1]
+
+    grid_min = values.min()
+    grid_max = values.max()
+    grid_avg = values.mean()
+    columns = grid_stats_columns(grid_options)
+    stats = [
+        int(values.size),
+        float(grid_min / grid_avg) if grid_avg else 'N/A',
+        float(grid_min / grid_max) if grid_max else 'N/A',
+    ]
+    thresholds = np.asarray(grid_options.thresholds, dtype=float)
+    stats += (100.0 * (values[:, None] >= thresholds).mean(axis=0)).tolist()
+    stats += np.percentile(values, grid_options.percentiles).tolist()
+    return dict(zip(columns, stats))
+
+def _mma_area_stats(mma_line, area_choice, base_filename):
+    """
+    Reads one [MMA] line for an area type (Full: MMA values 1-3, AOI: values 6-8).
+    Returns (area_type, min, max, average, parse_status, mma_values).
+    """
+    parts = mma_line.replace("[MMA]", "").strip().split()
+    mma_values = " | ".join(parts) # Store all raw values
+    area_type = area_choice # Store the requested type
+    parse_status = 'OK' # To track issues like missing AOI
+    min_val, max_val, avg_val = 'N/A', 'N/A', 'N/A' # Default values
+
+    if area_choice == "Full":
+        if len(parts) >= 3:
+            try:
+                min_val = float(parts[0])
+                max_val = float(parts[1])
+                avg_val = float(parts[2])
+            except (ValueError, IndexError):
+                print(f"Warning: Could not parse Full Area MMA (first 3) in {base_filename}: {mma_line}")
+                parse_status = 'MMA Parse Error (Full)'
+        else:
+             print(f"Warning: Not enough MMA values for Full Area in {base_filename}: {mma_line}")
+             parse_status = 'MMA Too Short (Full)'
+
+    elif area_choice == "AOI":
+        if len(parts) >= 8: # Need at least 8 parts for indices 5, 6, 7
+            try:
+                min_val = float(parts[5])
+                max_val = float(parts[6])
+                avg_val = float(parts[7])
+            except (ValueError, IndexError):
+                print(f"Warning: Could not parse AOI MMA (values 6-8) in {base_filename}: {mma_line}")
+                parse_status = 'MMA Parse Error (AOI)'
+        else:
+            print(f"Warning: AOI stats requested but not found (MMA line too short) in {base_filename}")
+            parse_status = 'AOI Stats Missing'
+            area_type = 'AOI (Not Found)' # Update area type status
+
+    return area_type, min_val, max_val, avg_val, parse_status, mma_values
 
-            if in_sim_block:
-                metric_desc_match = re.match(r"\[([A-Za-z0-9\s][^\]]*)\]\s*(.*)", line) # Slightly improved regex
-                if metric_desc_match:
-                    tag_content = metric_desc_match.group(1)
-                    description_content = metric_desc_match.group(2).strip()
-                    # Exclude known structural tags
-                    known_tags = ["RADIANCE", "Date", "Geometry", "Location", "Zone", "Stat", "Sim", "XYZ", "NxNy", "Period", "Data", "MMA"]
-                    if tag_content not in known_tags and description_content:
-                        current_sim_block_data['Metric Description'] = f"[{tag_content}] {description_content}"
-
-                if line.startswith("[MMA]"):
-                    parts = line.replace("[MMA]", "").strip().split()
-                    current_sim_block_data['MMA Values'] = " | ".join(parts) # Store all raw values
-
-                    min_val, max_val, avg_val = 'N/A', 'N/A', 'N/A' # Default values
-
-                    if area_choice == "Full":
-                        if len(parts) >= 3:
-                            try:
-                                min_val = float(parts[0])
-                                max_val = float(parts[1])
-                                avg_val = float(parts[2])
-                            except (ValueError, IndexError):
-                                print(f"Warning: Could not parse Full Area MMA (first 3) in {base_filename}: {line}")
-                                current_sim_block_data['Parse Status'] = 'MMA Parse Error (Full)'
-                        else:
-                             print(f"Warning: Not enough MMA values for Full Area in {base_filename}: {line}")
-                             current_sim_block_data['Parse Status'] = 'MMA Too Short (Full)'
-
-                    elif area_choice == "AOI":
-                        if len(parts) >= 8: # Need at least 8 parts for indices 5, 6, 7
-                            try:
-                                min_val = float(parts[5])
-                                max_val = float(parts[6])
-                                avg_val = float(parts[7])
-                            except (ValueError, IndexError):
-                                print(f"Warning: Could not parse AOI MMA (values 6-8) in {base_filename}: {line}")
-                                current_sim_block_data['Parse Status'] = 'MMA Parse Error (AOI)'
-                        else:
-                            print(f"Warning: AOI stats requested but not found (MMA line too short) in {base_filename}")
-                            current_sim_block_data['Parse Status'] = 'AOI Stats Missing'
-                            current_sim_block_data['Area Type'] = 'AOI (Not Found)' # Update area type status
-
-                    # Assign parsed values
-                    current_sim_block_data['Min'] = min_val
-                    current_sim_block_data['Max'] = max_val
-                    current_sim_block_data['Average'] = avg_val
-
-                    results.append(current_sim_block_data.copy())
-                    in_sim_block = False
-                    current_sim_block_data = {} # Reset for next potential block
+def _build_area_columns(room_id, room_name, metric_type, area_choice, blocks, base_filename, grid_options=None):
+    """
+    Builds the column batch for one file and area type: {column: [value per [Sim] block]}.
+    Rows are never materialised as dicts; writers consume the columns directly.
+    """
+    columns = {column: [] for column in stats_columns(grid_options)}
+    grid_columns = grid_stats_columns(grid_options) if grid_options is not None else ()
+    for metric_description, mma_line, grid_stats in blocks:
+        area_type, min_val, max_val, avg_val, parse_status, mma_values = _mma_area_stats(mma_line, area_choice, base_filename)
+        columns['Room ID'].append(room_id)
+        columns['Room Name'].append(room_name)
+        columns['File Metric Type'].append(metric_type)
+        columns['Area Type'].append(area_type)
+        columns['Metric Description'].append(metric_description)
+        columns['Min'].append(min_val)
+        columns['Max'].append(max_val)
+        columns['Average'].append(avg_val)
+        columns['Parse Status'].append(parse_status)
+        columns['MMA Values'].append(mma_values)
+        # Grid analytics describe the whole sensor grid, so they are reported on Full area rows only
+        for column in grid_columns:
+            columns[column].append(grid_stats[column] if grid_stats and area_choice == "Full" else 'N/A')
+    return columns
+
+def _error_columns(room_id, metric_type, area_choice, error, grid_options=None):
+    """Column batch with a single placeholder row indicating a file error."""
+    row = {
+        'Room ID': room_id, 'Room Name': 'File Error', 'File Metric Type': metric_type,
+        'Area Type': area_choice, 'Metric Description': f'Error processing file: {error}',
+        'Min': 'ERROR', 'Max': 'ERROR', 'Average': 'ERROR', 'MMA Values': 'ERROR', 'Parse Status': 'File Read Error'
+    }
+    return {column: [row.get(column, 'N/A')] for column in stats_columns(grid_options)}
+
+def batch_length(columns):
+    """Number of rows in a column batch."""
+    return len(columns['Room ID'])
+
+def batch_to_records(columns):
+    """Expands a column batch into per-row dicts (kept for parse_wpd_file's original return type)."""
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+def parse_wpd_file_columns(file_path, expected_metric_type_from_filename, area_choices=AREA_TYPES, grid_options=None, backend="auto"):
+    """
+    Parses a single .wpd file once and returns {area_type: column batch} for every requested
+    area type, so Full and AOI stats come from the same read. With grid_options, Full area
+    rows also carry grid analytics computed from the [Data] section. backend selects
+    the file reader (see _scan_wpd_blocks).
+    """
+    base_filename = os.path.basename(file_path)
+    room_id_from_filename = os.path.splitext(base_filename)[0].split('_')[0]
 
+    try:
+        room_id, room_name_from_file, blocks = _scan_wpd_blocks(file_path, grid_options, backend)
+        if room_id is None:
+            room_id = room_id_from_filename
+        return {
+            area_choice: _build_area_columns(room_id, room_name_from_file, expected_metric_type_from_filename, area_choice,
+                                             blocks, base_filename, grid_options)
+            for area_choice in area_choices
+        }
     except Exception as e:
         print(f"Error processing file {file_path}: {e}")
         # Add a placeholder result indicating the file error
-        results.append({
-            'Room ID': room_id_from_filename, 'Room Name': 'File Error', 'File Metric Type': expected_metric_type_from_filename,
-            'Area Type': area_choice, 'Metric Description': f'Error processing file: {e}',
-            'Min': 'ERROR', 'Max': 'ERROR', 'Average': 'ERROR', 'MMA Values': 'ERROR', 'Parse Status': 'File Read Error'
+        return {
+            area_choice: _error_columns(room_id_from_filename, expected_metric_type_from_filename, area_choice, e, grid_options)
+            for area_choice in area_choices
+        }
+
+def parse_wpd_file_areas(file_path, expected_metric_type_from_filename, area_choices=AREA_TYPES, grid_options=None, backend="auto"):
+    """
+    Like parse_wpd_file_columns, but returns {area_type: [record dict, ...]}.
+    """
+    area_columns = parse_wpd_file_columns(file_path, expected_metric_type_from_filename, area_choices, grid_options, backend)
+    return {area_choice: batch_to_records(columns) for area_choice, columns in area_columns.items()}
+
+def parse_wpd_file(file_path, expected_metric_type_from_filename, area_choice, grid_options=None, backend="auto"):
+    """
+    Parses a single .wpd file, extracting stats for the chosen area type (Full/AOI).
+    """
+    return parse_wpd_file_areas(file_path, expected_metric_type_from_filename, (area_choice,), grid_options, backend)[area_choice]
+
+def resolve_worker_count(workers=None):
+    """Returns the number of parse workers to use (defaults to one per CPU core)."""
+    if workers is None or workers <= 0:
+        workers = os.cpu_count() or 1
+    if os.name == "nt":
+        workers = min(workers, MAX_WORKERS_WINDOWS)
+    return max(1, workers)
+
+def _parse_wpd_task(task):
+    """
+    Runs one (file_path, metric, area, grid_options, backend) task for use with Executor.map.
+    Returns a column batch, or {area: column batch} for a tuple of area types.
+    """
+    file_path, metric_type, area_choice, grid_options, backend = task
+    if isinstance(area_choice, str):
+        return parse_wpd_file_columns(file_path, metric_type, (area_choice,), grid_options, backend)[area_choice]
+    return parse_wpd_file_columns(file_path, metric_type, area_choice, grid_options, backend)
+
+def _timed_parse_wpd_task(task):
+    """Runs _parse_wpd_task and returns (results, parse_seconds) as measured inside the worker."""
+    start = time.perf_counter()
+    results = _parse_wpd_task(task)
+    return results, time.perf_counter() - start
+
+def parse_wpd_files(file_paths, expected_metric_type_from_filename, area_choice, workers=None, chunksize=None, cache=None, grid_options=None, backend="auto", report=None):
+    """
+    Parses several .wpd files, spreading the work over a process pool.
+    Yields (file_path, results) pairs in the same order as file_paths, regardless
+    of which worker finishes first, so the output matches a serial run.
+    Results are column batches ({column: [values]}, see parse_wpd_file_columns), which
+    are cheaper to pickle back from workers than per-row dicts.
+    If the metric type is None it is taken from each filename. If area_choice is a
+    tuple of area types, results are {area: column batch} dicts from a single read per file.
+    If a ParseCache is given, unchanged files are served from it and only new or
+    modified files are parsed. grid_options enables the [Data] grid analytics stage and
+    backend selects the file reader ("auto", "stream" or "mmap"). If a RunReport is given,
+    each file's size, parse time, block count and status are recorded in it.
+    """
+    tasks = [(file_path, expected_metric_type_from_filename or metric_type_from_filename(file_path), area_choice, grid_options, backend)
+             for file_path in file_paths]
+    if cache is not None:
+        parsed = _run_parse_tasks_cached(tasks, workers, chunksize, cache)
+    else:
+        parsed = _run_parse_tasks(tasks, workers, chunksize)
+    for task, (file_path, file_results, parse_seconds) in zip(tasks, parsed):
+        if report is not None:
+            report.add_file(file_path, task[1], file_results if isinstance(area_choice, str) else file_results.values(), parse_seconds)
+        yield file_path, file_results
+
+def _run_parse_tasks(tasks, workers, chunksize):
+    """
+    Runs parse tasks serially or on a process pool, yielding (file_path, results, parse_seconds)
+    in task order.
+    """
+    workers = min(resolve_worker_count(workers), len(tasks) or 1)
+
+    if workers == 1 or len(tasks) < MIN_FILES_FOR_POOL:
+        for task in tasks:
+            yield (task[0], *_timed_parse_wpd_task(task))
+        return
+
+    if not chunksize or chunksize <= 0:
+        chunksize = max(1, len(tasks) // (workers * TASKS_PER_WORKER))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Executor.map returns results in submission order
+        for task, (file_results, parse_seconds) in zip(tasks, executor.map(_timed_parse_wpd_task, tasks, chunksize=chunksize)):
+            yield task[0], file_results, parse_seconds
+
+def _run_parse_tasks_cached(tasks, workers, chunksize, cache):
+    """
+    Serves cache hits and parses the misses, merging both back into task order.
+    Cache hits are yielded with a parse time of None.
+    """
+    cached = {}
+    file_stats = {}
+    for file_path, metric_type, area_choice, grid_options, _ in tasks:
+        file_stat = cache.stat(file_path)
+        file_stats[file_path] = file_stat
+        if file_stat is not None:
+            hit = cache.get(file_path, file_stat, metric_type, area_choice, grid_options)
+            if hit is not None:
+                cached[file_path] = hit
+
+    misses = [task for task in tasks if task[0] not in cached]
+    print(f"Parse cache: {len(cached)} unchanged, {len(misses)} new or modified.")
+    parsed = _run_parse_tasks(misses, workers, chunksize)
+
+    for file_path, metric_type, area_choice, grid_options, _ in tasks:
+        if file_path in cached:
+            yield file_path, cached[file_path], None
+            continue
+        parsed_path, file_results, parse_seconds = next(parsed)
+        file_stat = file_stats[parsed_path]
+        if file_stat is not None:
+            cache.put(parsed_path, file_stat, metric_type, area_choice, file_results, grid_options)
+        yield parsed_path, file_results, parse_seconds
+    cache.commit()
+
+# --- Parse Cache ---
+
+class ParseCache:
+    """
+    SQLite sidecar in the results folder holding parsed column batches per .wpd file.
+    Entries are keyed on file name, metric and area type and are only reused
+    while the file's size and modification time are unchanged.
+    """
+
+    def __init__(self, folder_path):
+        self.folder_path = folder_path
+        self.db_path = os.path.join(folder_path, PARSE_CACHE_FILENAME)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS parsed ("
+            "filename TEXT, metric TEXT, area TEXT, size INTEGER, mtime_ns INTEGER, records TEXT, "
+            "PRIMARY KEY (filename, metric, area))"
+        )
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != str(PARSE_CACHE_VERSION):
+            # Parser output format changed; nothing stored so far can be trusted
+            self.conn.execute("DELETE FROM parsed")
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (str(PARSE_CACHE_VERSION),))
+        self.conn.commit()
+
+    @staticmethod
+    def stat(file_path):
+        """Returns the (size, mtime_ns) cache key for a file, or None if it cannot be read."""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    @staticmethod
+    def area_key(area, grid_options=None):
+        """Cache key for an area type (or a tuple of area types parsed together) and any grid analytics settings."""
+        key = area if isinstance(area, str) else "+".join(area)
+        if grid_options is not None:
+            key += f"|grid:{','.join(map(str, grid_options.thresholds))}:{','.join(map(str, grid_options.percentiles))}"
+        return key
+
+    def get(self, file_path, file_stat, metric, area, grid_options=None):
+        """Returns the cached column batches for a file, or None if missing or out of date."""
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, records FROM parsed WHERE filename = ? AND metric = ? AND area = ?",
+            (os.path.basename(file_path), metric, self.area_key(area, grid_options)),
+        ).fetchone()
+        if row is None or (row[0], row[1]) != tuple(file_stat):
+            return None
+        return json.loads(row[2])
+
+    def put(self, file_path, file_stat, metric, area, results, grid_options=None):
+        """Stores parsed column batches for a file. File read errors are not cached so they are retried."""
+        batches = [results] if isinstance(area, str) else results.values()
+        if any('File Read Error' in batch['Parse Status'] for batch in batches):
+            return
+        self.conn.execute(
+            "INSERT OR REPLACE INTO parsed (filename, metric, area, size, mtime_ns, records) VALUES (?, ?, ?, ?, ?, ?)",
+            (os.path.basename(file_path), metric, self.area_key(area, grid_options), file_stat[0], file_stat[1], json.dumps(results)),
+        )
+
+    def prune(self, existing_filenames):
+        """Drops entries for .wpd files that no longer exist in the folder. Returns the number removed."""
+        existing_filenames = set(existing_filenames)
+        stale = [(filename,) for (filename,) in self.conn.execute("SELECT DISTINCT filename FROM parsed")
+                 if filename not in existing_filenames]
+        self.conn.executemany("DELETE FROM parsed WHERE filename = ?", stale)
+        self.conn.commit()
+        return len(stale)
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+def open_parse_cache(folder_path):
+    """Opens the parse cache for a folder, or returns None if it cannot be used (e.g. read-only share)."""
+    try:
+        cache = ParseCache(folder_path)
+        removed = cache.prune(f for f in os.listdir(folder_path) if f.endswith(".wpd"))
+        if removed:
+            print(f"Parse cache: dropped {removed} entries for deleted files.")
+        return cache
+    except (sqlite3.Error, OSError) as e:
+        print(f"Warning: Parse cache unavailable in {folder_path}, parsing all files: {e}")
+        return None
+
+def purge_parse_cache(folder_path):
+    """Deletes the parse cache sidecar from a results folder. Returns True if a cache was removed."""
+    db_path = os.path.join(folder_path, PARSE_CACHE_FILENAME)
+    if os.path.isfile(db_path):
+        os.remove(db_path)
+        return True
+    return False
+
+# --- Export Functions ---
+
+def stats_columns(grid_options=None):
+    """Export column order; grid analytics columns (if any) sit right after Min/Max/Average."""
+    split = STATS_COLUMNS.index('Average') + 1
+    extra_cols = grid_stats_columns(grid_options) if grid_options is not None else []
+    return STATS_COLUMNS[:split] + extra_cols + STATS_COLUMNS[split:]
+
+def build_stats_dataframe(batches, columns=STATS_COLUMNS):
+    """Creates the export DataFrame for one sheet from column batches, in the standard column order."""
+    import pandas as pd
+
+    data = {col: [] for col in columns}
+    for batch in batches:
+        n = batch_length(batch)
+        for col in columns:
+            data[col].extend(batch.get(col, ['N/A'] * n)) # Add missing columns if any error occurred
+    return pd.DataFrame(data, columns=columns)
+
+def sheet_names_for(sheet_keys):
+    """Maps (metric, area) keys to unique Excel sheet names of at most 31 characters."""
+    names = {}
+    used = set()
+    for metric_type, area_type in sheet_keys:
+        name = f"{metric_type}_{area_type}"[:SHEET_NAME_LIMIT]
+        counter = 2
+        while name.lower() in used: # Excel sheet names are case-insensitive
+            suffix = f"~{counter}"
+            name = f"{metric_type}_{area_type}"[:SHEET_NAME_LIMIT - len(suffix)] + suffix
+            counter += 1
+        used.add(name.lower())
+        names[(metric_type, area_type)] = name
+    return names
+
+class StreamingExcelWriter:
+    """
+    Streams stats rows into an .xlsx through openpyxl's write-only workbook, so memory stays
+    constant however many rows are exported. openpyxl buffers each sheet's rows in a temporary
+    file and the workbook is only assembled by save(), so the output path can be chosen after parsing.
+    """
+
+    def __init__(self, sheet_keys, columns=STATS_COLUMNS):
+        from openpyxl import Workbook
+
+        self.columns = list(columns)
+        self.workbook = Workbook(write_only=True)
+        self.sheet_names = sheet_names_for(sheet_keys)
+        self.sheets = {}
+        self.row_counts = {}
+        for key, sheet_name in self.sheet_names.items():
+            worksheet = self.workbook.create_sheet(title=sheet_name)
+            worksheet.append(self._header_row(worksheet))
+            self.sheets[key] = worksheet
+            self.row_counts[key] = 0
+
+    def _header_row(self, worksheet):
+        """Header cells styled like pandas' to_excel output (bold, thin border, centred)."""
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Alignment, Border, Font, Side
+
+        thin = Side(style="thin")
+        cells = []
+        for column in self.columns:
+            cell = WriteOnlyCell(worksheet, value=column)
+            cell.font = Font(bold=True)
+            cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+            cell.alignment = Alignment(horizontal="center", vertical="top")
+            cells.append(cell)
+        return cells
+
+    def write_columns(self, key, batch):
+        """Appends a column batch to the sheet for a (metric, area) key."""
+        worksheet = self.sheets[key]
+        n = batch_length(batch)
+        for row in zip(*(batch.get(col, ['N/A'] * n) for col in self.columns)):
+            worksheet.append(row)
+        self.row_counts[key] += n
+
+    def total_rows(self):
+        return sum(self.row_counts.values())
+
+    def save(self, excel_file_path):
+        """Writes the workbook, leaving out sheets that received no rows."""
+        for key, worksheet in self.sheets.items():
+            if not self.row_counts[key]:
+                self.workbook.remove(worksheet)
+        self.workbook.save(excel_file_path)
+
+    def discard(self):
+        """Closes the sheet streams without writing a workbook (e.g. when the save is cancelled)."""
+        for worksheet in self.sheets.values():
+            worksheet.close()
+
+def numeric_stats_columns(grid_options=None):
+    """Columns that hold numbers (null when missing) in columnar outputs."""
+    numeric_cols = ['Min', 'Max', 'Average']
+    if grid_options is not None:
+        numeric_cols += grid_stats_columns(grid_options)
+    return numeric_cols
+
+class ColumnarWriter:
+    """
+    Streams stats rows into one Parquet, Arrow IPC or CSV table (format taken from the file
+    extension) for dashboards. Unlike the Excel export, numeric columns hold real numbers
+    with nulls in place of 'N/A'/'ERROR' strings; the reason stays in Parse Status.
+    The file is written under a temporary name and only moved into place by close().
+    Parquet and Arrow need the optional pyarrow package; CSV uses the standard library.
+    """
+
+    def __init__(self, output_path, columns=STATS_COLUMNS, numeric_columns=('Min', 'Max', 'Average')):
+        self.output_path = output_path
+        self.fmt = COLUMNAR_FORMATS.get(os.path.splitext(output_path)[1].lower())
+        if self.fmt is None:
+            raise ValueError(f"Unsupported columnar output '{output_path}'. Use one of: {', '.join(COLUMNAR_FORMATS)}")
+        self.columns = list(columns)
+        self.numeric_columns = set(numeric_columns)
+        self.tmp_path = f"{output_path}.partial"
+        self.rows = 0
+        self.buffer = {col: [] for col in self.columns}
+        self.buffered = 0
+        self._file = None
+        self._writer = None
+
+        if self.fmt == "csv":
+            self._file = open(self.tmp_path, "w", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(self.columns)
+        else:
+            try:
+                import pyarrow as pa
+            except ImportError as e:
+                raise ImportError("Parquet/Arrow output needs pyarrow (pip install pyarrow); CSV works without it.") from e
+            self._pa = pa
+            self.schema = pa.schema([
+                (col, pa.int64() if col == 'Grid Points' else pa.float64() if col in self.numeric_columns else pa.string())
+                for col in self.columns
+            ])
+
+    def _value(self, col, value):
+        if col in self.numeric_columns:
+            # 'N/A' / 'ERROR' sentinels become nulls so the column stays numeric
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return value
+            return None
+        return None if value is None else str(value)
+
+    def write_columns(self, key, batch):
+        """Appends a column batch; the (metric, area) key is already carried by the batch columns."""
+        n = batch_length(batch)
+        converted = [[self._value(col, value) for value in batch.get(col, [None] * n)] for col in self.columns]
+        self.rows += n
+        if self.fmt == "csv":
+            self._writer.writerows(["" if value is None else value for value in row] for row in zip(*converted))
+            return
+        for col, values in zip(self.columns, converted):
+            self.buffer[col].extend(values)
+        self.buffered += n
+        if self.buffered >= COLUMNAR_BATCH_ROWS:
+            self._flush()
+
+    def _flush(self):
+        pa = self._pa
+        if self._writer is None:
+            if self.fmt == "parquet":
+                import pyarrow.parquet as pq
+                self._writer = pq.ParquetWriter(self.tmp_path, self.schema)
+            else:
+                self._writer = pa.ipc.new_file(self.tmp_path, self.schema)
+        if self.buffered:
+            batch = pa.record_batch([pa.array(self.buffer[col], type=self.schema.field(col).type) for col in self.columns],
+                                    schema=self.schema)
+            self._writer.write_batch(batch)
+        self.buffer = {col: [] for col in self.columns}
+        self.buffered = 0
+
+    def close(self):
+        """Writes any buffered rows and moves the finished file into place."""
+        if self.fmt == "csv":
+            self._file.close()
+        else:
+            self._flush()
+            self._writer.close()
+        os.replace(self.tmp_path, self.output_path)
+
+    def abort(self):
+        """Discards a partially written output."""
+        try:
+            if self._file is not None:
+                self._file.close()
+            elif self._writer is not None:
+                self._writer.close()
+        finally:
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+
+def export_stats_to_excel(sheets, excel_file_path, columns=STATS_COLUMNS):
+    """Writes {(metric, area): [column batches]} to one workbook, one sheet per metric/area combination."""
+    writer = StreamingExcelWriter(sheets, columns)
+    for key, batches in sheets.items():
+        for batch in batches:
+            writer.write_columns(key, batch)
+    writer.save(excel_file_path)
+
+# --- Run Report ---
+
+class RunReport:
+    """
+    Timings for one export run: each file's size, parse time, block count and status, plus
+    wall-clock totals for the scan, parse and export phases. Written as a JSON or CSV report
+    to find slow network shares or broken files in big batches.
+    """
+
+    def __init__(self, folder_path=None):
+        self.folder_path = folder_path
+        self.started = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.files = []
+        self.phases = {"scan": 0.0, "parse": 0.0, "export": 0.0}
+        self.outputs = [] # Files written by the run
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Adds the wall-clock time spent in the with-block to a phase total."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - start)
+
+    def add_phase(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add_file(self, file_path, metric_type, batches, parse_seconds=None):
+        """Records one file's column batches. parse_seconds is None for parse cache hits."""
+        batches = list(batches)
+        statuses = [status for batch in batches for status in batch['Parse Status']]
+        issues = [status for status in statuses if status != 'OK']
+        if 'File Read Error' in issues:
+            status, blocks = 'File Read Error', 0
+        else:
+            blocks = batch_length(batches[0]) if batches else 0
+            status = issues[0] if issues else 'OK' if blocks else 'No Blocks'
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            size = None
+        self.files.append({
+            'File': os.path.basename(file_path), 'Metric': metric_type, 'Size (bytes)': size,
+            'Parse Seconds': None if parse_seconds is None else round(parse_seconds, 6),
+            'Blocks': blocks, 'Status': status, 'Issues': len(issues), 'Cached': parse_seconds is None,
         })
-    return results
+
+    def slowest(self, count=REPORT_SLOWEST_FILES):
+        """The parsed (not cached) files that took longest, slowest first."""
+        parsed = [entry for entry in self.files if entry['Parse Seconds'] is not None]
+        return sorted(parsed, key=lambda entry: entry['Parse Seconds'], reverse=True)[:count]
+
+    def summary(self):
+        """Run totals. Parse throughput counts only files that were actually parsed."""
+        parsed = [entry for entry in self.files if entry['Parse Seconds'] is not None]
+        parsed_bytes = sum(entry['Size (bytes)'] or 0 for entry in parsed)
+        parse_wall = self.phases.get("parse", 0.0)
+        return {
+            'Folder': self.folder_path,
+            'Started': self.started,
+            'Files': len(self.files),
+            'Parsed Files': len(parsed),
+            'Cached Files': len(self.files) - len(parsed),
+            'Failed Files': sum(entry['Status'] == 'File Read Error' for entry in self.files),
+            'Files With Issues': sum(entry['Issues'] > 0 for entry in self.files),
+            'Blocks': sum(entry['Blocks'] for entry in self.files),
+            'Total Bytes': sum(entry['Size (bytes)'] or 0 for entry in self.files),
+            'Phase Seconds': {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            'Total Seconds': round(sum(self.phases.values()), 6),
+            'File Parse Seconds': round(sum(entry['Parse Seconds'] for entry in parsed), 6), # Summed over workers
+            'Parse MB/s': round(parsed_bytes / (1024 * 1024) / parse_wall, 3) if parse_wall and parsed else None,
+            'Parse Files/s': round(len(parsed) / parse_wall, 3) if parse_wall and parsed else None,
+            'Outputs': list(self.outputs),
+        }
+
+    def print_summary(self, count=5):
+        summary = self.summary()
+        phases = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in summary['Phase Seconds'].items())
+        print(f"\nTiming: {phases} (total {summary['Total Seconds']:.2f}s)")
+        if summary['Parse MB/s'] is not None:
+            print(f"Parse throughput: {summary['Parse Files/s']:.1f} files/s, {summary['Parse MB/s']:.2f} MB/s "
+                  f"({summary['Parsed Files']} parsed, {summary['Cached Files']} from cache)")
+        slowest = self.slowest(count)
+        if slowest:
+            print("Slowest files:")
+            for entry in slowest:
+                print(f"  {entry['Parse Seconds']:8.3f}s  {(entry['Size (bytes)'] or 0) / (1024 * 1024):8.2f} MB  "
+                      f"{entry['Blocks']:5d} blocks  {entry['Status']:<16} {entry['File']}")
+
+    def write(self, report_path):
+        """Writes the report as JSON (summary, slowest files and every file) or CSV (one row per file)."""
+        ext = os.path.splitext(report_path)[1].lower()
+        if ext not in REPORT_FORMATS:
+            raise ValueError(f"Unsupported report format '{ext}'. Use one of: {', '.join(REPORT_FORMATS)}")
+        with open(report_path, "w", newline="", encoding="utf-8") as f:
+            if ext == ".json":
+                json.dump({'Summary': self.summary(), 'Slowest Files': self.slowest(), 'Files': self.files}, f, indent=2)
+            else:
+                writer = csv.DictWriter(f, fieldnames=REPORT_FILE_COLUMNS)
+                writer.writeheader()
+                writer.writerows(self.files)
+
+# --- Design Option Comparison ---
+
+class BatchCollector:
+    """Writer that keeps column batches in memory per (metric, area) key, for building DataFrames."""
+
+    def __init__(self):
+        self.batches = defaultdict(list)
+
+    def write_columns(self, key, batch):
+        self.batches[key].append(batch)
+
+def comparison_columns(labels, value_columns, with_pass=False):
+    """Column order of a comparison table: values per option, then deltas against the first option."""
+    columns = ['Room ID', 'Room Name', 'Metric Description']
+    for col in value_columns:
+        columns += [f"{col} [{label}]" for label in labels]
+        columns += [f"Delta {col} [{label}]" for label in labels[1:]]
+    if with_pass:
+        columns += [f"Pass [{label}]" for label in labels]
+        columns += [f"Pass Change [{label}]" for label in labels[1:]]
+    return columns
+
+def compare_design_options(option_frames, value_columns=('Min', 'Max', 'Average'), target=None, target_column='Average'):
+    """
+    Joins the export tables of several design options into one table keyed on Room ID and
+    metric description. option_frames is [(label, DataFrame)], baseline first. Each option
+    gets its own value columns plus deltas against the baseline; with a target, each option is
+    marked Pass/Fail on target_column and the change against the baseline (Gained/Lost/Same)
+    is reported. Everything is computed with outer joins and column arithmetic, no row loops.
+    """
+    import numpy as np
+    import pandas as pd
+
+    labels = [label for label, _ in option_frames]
+    join_columns = COMPARE_KEY_COLUMNS + ['Occurrence']
+    merged = None
+    for label, df in option_frames:
+        part = df[COMPARE_KEY_COLUMNS + ['Room Name', *value_columns]].copy()
+        # Numbers the repeats of a key within one option, so repeated descriptions pair up in order
+        part['Occurrence'] = part.groupby(COMPARE_KEY_COLUMNS, sort=False).cumcount()
+        for col in value_columns:
+            part[col] = pd.to_numeric(part[col], errors='coerce') # 'N/A' / 'ERROR' become NaN
+        part = part.rename(columns={col: f"{col} [{label}]" for col in ['Room Name', *value_columns]})
+        merged = part if merged is None else merged.merge(part, on=join_columns, how='outer', sort=False)
+
+    result = merged[COMPARE_KEY_COLUMNS].copy()
+    # Room names can differ (or be missing) between options; take the first one found
+    result.insert(1, 'Room Name', merged[[f"Room Name [{label}]" for label in labels]].bfill(axis=1).iloc[:, 0])
+    for col in value_columns:
+        base = merged[f"{col} [{labels[0]}]"]
+        for label in labels:
+            result[f"{col} [{label}]"] = merged[f"{col} [{label}]"]
+        for label in labels[1:]:
+            result[f"Delta {col} [{label}]"] = merged[f"{col} [{label}]"] - base
+
+    if target is not None:
+        status = {}
+        for label in labels:
+            values = merged[f"{target_column} [{label}]"]
+            status[label] = np.where(values.isna(), 'N/A', np.where(values >= target, 'Pass', 'Fail'))
+            result[f"Pass [{label}]"] = status[label]
+        for label in labels[1:]:
+            base, option = status[labels[0]], status[label]
+            result[f"Pass Change [{label}]"] = np.select(
+                [(base == 'N/A') | (option == 'N/A'), base == option, option == 'Pass'],
+                ['N/A', 'Same', 'Gained'], default='Lost')
+    return result[comparison_columns(labels, value_columns, target is not None)].reset_index(drop=True)
+
+def frame_to_columns(df):
+    """Converts a DataFrame to a column batch for the writers, with NaN shown as 'N/A'."""
+    return {col: df[col].astype(object).where(df[col].notna(), 'N/A').tolist() for col in df.columns}
 
 # --- Main Execution ---
 
-def main():
-    """Main function to orchestrate the process."""
+def collect_stats(radiance_folder, metric_types, area_types, writers, workers=None, use_cache=True, grid_options=None, backend="auto",
+                  report=None, folder_scan=None):
+    """
+    Parses every .wpd file for the given metrics once and streams each file's column batch to
+    every writer (Excel and/or columnar) under its (metric, area) key as soon as it is parsed.
+    The file list comes from a FolderScan started earlier if one is given.
+    If a RunReport is given, per-file timings and the scan/parse/export phase times go into it
+    (time spent in the writers counts as export, not parse).
+    Returns (file_count, row_count, failed_files).
+    """
+    if report is None:
+        report = RunReport(radiance_folder)
+    file_count = 0
+    row_count = 0
+    failed_files = []
+    suffixes = tuple(f"_{metric_type}.wpd" for metric_type in metric_types)
+    with report.phase("scan"):
+        if folder_scan is not None:
+            file_paths = folder_scan.file_paths(metric_types)
+        else:
+            file_paths = [os.path.join(radiance_folder, filename) for filename in os.listdir(radiance_folder)
+                          if filename.endswith(suffixes)]
+    print(f"Using {min(resolve_worker_count(workers), len(file_paths) or 1)} worker(s) for {len(file_paths)} files.")
+    parse_start = time.perf_counter()
+    export_seconds = 0.0
+    cache = open_parse_cache(radiance_folder) if use_cache else None
+    try:
+        for file_path, area_stats in parse_wpd_files(file_paths, None, area_types, workers=workers, cache=cache, grid_options=grid_options,
+                                                     backend=backend, report=report):
+            print(f"  Parsed: {os.path.basename(file_path)}")
+            metric_type = metric_type_from_filename(file_path)
+            file_rows = 0
+            write_start = time.perf_counter()
+            for area_type, batch in area_stats.items():
+                for writer in writers:
+                    writer.write_columns((metric_type, area_type), batch)
+                file_rows += batch_length(batch)
+            export_seconds += time.perf_counter() - write_start
+            row_count += file_rows
+            if any('File Read Error' in batch['Parse Status'] for batch in area_stats.values()):
+                failed_files.append(file_path)
+            if file_rows:
+                file_count += 1
+    finally:
+        report.add_phase("parse", time.perf_counter() - parse_start - export_seconds)
+        report.add_phase("export", export_seconds)
+        if cache is not None:
+            cache.close()
+
+    if row_count:
+        print(f"\nProcessed {file_count} files. Found {row_count} metric entries.")
+    return file_count, row_count, failed_files
+
+def main(workers=None, use_cache=True, grid_options=None):
+    """Main function to orchestrate the process through tkinter dialogs."""
+    import tkinter as tk
+    from tkinter import filedialog, messagebox
+
     radiance_folder = get_radiance_folder()
     if not radiance_folder: return
 
-    available_metrics = get_available_metrics_from_files(radiance_folder)
+    # The folder is listed once; stat calls and the Excel engine preload continue while the
+    # metric and area dialogs are open
+    folder_scan = FolderScan(radiance_folder, grid_stats=grid_options is not None)
+    folder_scan.start()
+    try:
+        available_metrics = folder_scan.metric_types()
+    except OSError:
+        available_metrics = []
     if not available_metrics: return
 
     selected_metric_type = select_metric_from_list(available_metrics)
@@ -229,36 +1204,29 @@ def main():
     selected_area_type = select_area_type()
     if not selected_area_type: return
 
-    all_room_stats = []
-    file_count = 0
-    print(f"\nProcessing files for Metric: '{selected_metric_type}', Area: '{selected_area_type}'...")
-    for filename in os.listdir(radiance_folder):
-        if filename.endswith(f"_{selected_metric_type}.wpd"):
-            file_path = os.path.join(radiance_folder, filename)
-            print(f"  Parsing: {filename}")
-            file_stats = parse_wpd_file(file_path, selected_metric_type, selected_area_type)
-            if file_stats:
-                all_room_stats.extend(file_stats)
-                file_count += 1
+    metric_types = available_metrics if selected_metric_type == ALL_METRICS else [selected_metric_type]
+    area_types = AREA_TYPES if selected_area_type == BOTH_AREAS else (selected_area_type,)
 
-    if not all_room_stats:
+    print(f"\nProcessing files for Metric: '{selected_metric_type}', Area: '{selected_area_type}'...")
+    # The writer imports openpyxl; importing it while the scan is still preloading it can
+    # hand this thread a half-initialised module
+    folder_scan.join()
+    # One sheet per metric/area combination, in dialog order
+    writer = StreamingExcelWriter([(metric_type, area_type) for metric_type in metric_types for area_type in area_types],
+                                  stats_columns(grid_options))
+    report = RunReport(radiance_folder)
+    collect_stats(radiance_folder, metric_types, area_types, [writer], workers=workers, use_cache=use_cache, grid_options=grid_options,
+                  report=report, folder_scan=folder_scan)
+    if not writer.total_rows():
+        writer.discard()
         messagebox.showinfo("Info", f"No data extracted for metric '{selected_metric_type}' and area '{selected_area_type}'. Check files and settings.")
         return
 
-    print(f"\nProcessed {file_count} files. Found {len(all_room_stats)} metric entries.")
-
-    # Create and structure DataFrame
-    df = pd.DataFrame(all_room_stats)
-    cols_order = ['Room ID', 'Room Name', 'File Metric Type', 'Area Type', 'Metric Description', 'Min', 'Max', 'Average', 'Parse Status', 'MMA Values']
-    for col in cols_order:
-        if col not in df.columns:
-            df[col] = 'N/A' # Add missing columns if any error occurred
-    df = df[cols_order]
-
     # Ask for save location
     save_path_gui_root = tk.Tk()
     save_path_gui_root.withdraw()
-    initial_filename = f"Daylight_Stats_{selected_metric_type}_{selected_area_type}.xlsx"
+    metric_label = "All" if selected_metric_type == ALL_METRICS else selected_metric_type
+    initial_filename = f"Daylight_Stats_{metric_label}_{selected_area_type}.xlsx"
     excel_file_path = filedialog.asksaveasfilename(
         title="Save Excel File",
         defaultextension=".xlsx",
@@ -270,14 +1238,513 @@ def main():
     # Export to Excel
     if excel_file_path:
         try:
-            df.to_excel(excel_file_path, index=False, sheet_name=f"{selected_metric_type}_{selected_area_type}"[:31]) # Sheet name limit is 31 chars
-            messagebox.showinfo("Success", f"Stats exported to {excel_file_path}")
+            with report.phase("export"):
+                writer.save(excel_file_path)
+            report.outputs.append(excel_file_path)
+            report.print_summary()
+            # Double-click runs keep the same record as CLI runs with --report
+            report_path = os.path.splitext(excel_file_path)[0] + GUI_REPORT_SUFFIX
+            try:
+                report.write(report_path)
+                report_note = f"\n\nRun report: {report_path}"
+            except OSError as e:
+                print(f"Warning: Could not write run report: {e}")
+                report_note = ""
+            messagebox.showinfo("Success", f"Stats exported to {excel_file_path}{report_note}")
             print(f"\nStats successfully exported to {excel_file_path}")
+            if report_note:
+                print(f"Run report written to {report_path}")
         except Exception as e:
             messagebox.showerror("Error", f"Could not save Excel file: {e}")
             print(f"Error saving Excel file: {e}")
     else:
+        writer.discard()
         messagebox.showinfo("Info", "Save operation cancelled.")
 
+# --- Watch Mode ---
+
+class WpdFolderWatcher:
+    """
+    Watches a results folder for matching .wpd files and reports the ones that are new or
+    rewritten once they have finished being written (size and mtime unchanged for
+    settle_seconds and the file can be opened). Uses the optional watchdog package for native
+    change notifications (inotify / ReadDirectoryChangesW) and falls back to polling the
+    folder listing; with watchdog the folder is still re-listed every WATCH_RESCAN_SECONDS
+    in case a notification is missed (common on network shares).
+    """
+
+    def __init__(self, folder_path, metric_types=None, settle_seconds=WATCH_SETTLE_SECONDS):
+        self.folder_path = folder_path
+        self.suffixes = tuple(f"_{metric_type}.wpd" for metric_type in metric_types) if metric_types else None
+        self.settle_seconds = settle_seconds
+        self.known = {} # file_path -> (size, mtime_ns) already handed out
+        self.pending = {} # file_path -> ((size, mtime_ns), unchanged_since)
+        self.dirty = set() # Paths reported by change notifications
+        self.dirty_lock = threading.Lock()
+        self.observer = None
+        self.last_listing = 0.0
+
+    def matches(self, filename):
+        if not filename.endswith(".wpd") or not metric_type_from_filename(filename):
+            return False
+        return self.suffixes is None or filename.endswith(self.suffixes)
+
+    def start(self):
+        """Starts native change notifications if watchdog is installed. Returns the mode in use."""
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return "polling"
+
+        watcher = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory:
+                    return
+                with watcher.dirty_lock:
+                    for path in (getattr(event, "src_path", None), getattr(event, "dest_path", None)):
+                        if path:
+                            watcher.dirty.add(os.path.join(watcher.folder_path, os.path.basename(path)))
+
+        self.observer = Observer()
+        self.observer.schedule(_Handler(), self.folder_path, recursive=False)
+        self.observer.start()
+        return "notifications"
+
+    def stop(self):
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
+
+    def _candidates(self, now):
+        """Paths worth stat-ing this round: everything on a re-list, otherwise notified and pending paths."""
+        if self.observer is None or now - self.last_listing >= WATCH_RESCAN_SECONDS:
+            self.last_listing = now
+            listed = {os.path.join(self.folder_path, filename) for filename in os.listdir(self.folder_path)}
+            return listed | set(self.known) | set(self.pending)
+        with self.dirty_lock:
+            dirty, self.dirty = self.dirty, set()
+        return dirty | set(self.pending)
+
+    def poll(self):
+        """Returns (ready_paths, deleted_paths) since the last call."""
+        now = time.monotonic()
+        ready = []
+        deleted = []
+        for file_path in sorted(self._candidates(now)):
+            if not self.matches(os.path.basename(file_path)):
+                continue
+            file_stat = ParseCache.stat(file_path)
+            if file_stat is None:
+                self.pending.pop(file_path, None)
+                if self.known.pop(file_path, None) is not None:
+                    deleted.append(file_path)
+                continue
+            if self.known.get(file_path) == file_stat:
+                continue
+            previous = self.pending.get(file_path)
+            if previous is None or previous[0] != file_stat:
+                self.pending[file_path] = (file_stat, now) # Still changing; restart the settle timer
+                continue
+            if now - previous[1] < self.settle_seconds or not self._readable(file_path):
+                continue
+            del self.pending[file_path]
+            self.known[file_path] = file_stat
+            ready.append(file_path)
+        return ready, deleted
+
+    @staticmethod
+    def _readable(file_path):
+        """False while another process (e.g. the simulation) still holds the file exclusively."""
+        try:
+            with open(file_path, 'rb'):
+                return True
+        except OSError:
+            return False
+
+def write_stats_outputs(batches_by_file, area_types, excel_file_path, columnar_paths=(), grid_options=None):
+    """
+    Rewrites the Excel workbook (and any columnar outputs) from already-parsed column batches, one
+    sheet per metric/area. Each file is written under a temporary name and then replaced,
+    so readers never see a half-written export.
+    """
+    metric_types = sorted({metric_type_from_filename(file_path) for file_path in batches_by_file})
+    columns = stats_columns(grid_options)
+    writers = [StreamingExcelWriter([(metric_type, area_type) for metric_type in metric_types for area_type in area_types], columns)]
+    writers += [ColumnarWriter(columnar_path, columns, numeric_stats_columns(grid_options)) for columnar_path in columnar_paths]
+    try:
+        for file_path, area_stats in batches_by_file.items():
+            metric_type = metric_type_from_filename(file_path)
+            for area_type, batch in area_stats.items():
+                for writer in writers:
+                    writer.write_columns((metric_type, area_type), batch)
+    except Exception:
+        writers[0].discard()
+        for writer in writers[1:]:
+            writer.abort()
+        raise
+
+    root, ext = os.path.splitext(excel_file_path)
+    tmp_path = f"{root}.partial{ext}"
+    try:
+        if writers[0].total_rows():
+            writers[0].save(tmp_path)
+            os.replace(tmp_path, excel_file_path) # Fails while the workbook is open in Excel on Windows
+        else:
+            writers[0].discard()
+    except Exception:
+        # Leave no open handles or .partial files behind (watch mode retries on the next change)
+        with contextlib.suppress(Exception):
+            writers[0].discard()
+        for writer in writers[1:]:
+            writer.abort()
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+    # Columnar outputs are only moved into place once the workbook has been
+    for writer in writers[1:]:
+        writer.close()
+
+def watch_folder(radiance_folder, metric_types, area_types, excel_file_path, columnar_paths=(), workers=None,
+                 use_cache=True, grid_options=None, backend="auto",
+                 settle_seconds=WATCH_SETTLE_SECONDS, poll_interval=WATCH_POLL_SECONDS, stop_event=None):
+    """
+    Keeps the export up to date while simulations are still writing results. Only files that
+    are new or rewritten are parsed; batches of unchanged files are kept in memory and the
+    outputs are rewritten after each batch. Runs until Ctrl+C or until stop_event is set.
+    """
+    watcher = WpdFolderWatcher(radiance_folder, metric_types, settle_seconds)
+    mode = watcher.start()
+    print(f"Watching {radiance_folder} ({mode}, settle {settle_seconds:g}s). Press Ctrl+C to stop.")
+    batches_by_file = {}
+    cache = open_parse_cache(radiance_folder) if use_cache else None
+    try:
+        while stop_event is None or not stop_event.is_set():
+            ready, deleted = watcher.poll()
+            for file_path in deleted:
+                print(f"  Removed: {os.path.basename(file_path)}")
+                batches_by_file.pop(file_path, None)
+            if ready:
+                for file_path, area_stats in parse_wpd_files(ready, None, area_types, workers=workers, cache=cache,
+                                                             grid_options=grid_options, backend=backend):
+                    print(f"  Parsed: {os.path.basename(file_path)}")
+                    batches_by_file[file_path] = area_stats
+            if ready or deleted:
+                try:
+                    write_stats_outputs(batches_by_file, area_types, excel_file_path, columnar_paths, grid_options)
+                    print(f"Export updated: {len(batches_by_file)} files -> {excel_file_path}")
+                except OSError as e:
+                    # Typically the workbook is open in Excel; keep the batches and retry on the next change
+                    print(f"Warning: Could not update export ({e}). Will retry on the next change.")
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        print("\nWatch stopped.")
+    finally:
+        watcher.stop()
+        if cache is not None:
+            cache.close()
+    return batches_by_file
+
+# --- Command-Line Mode ---
+
+EXIT_OK = 0 # Export written, every file parsed
+EXIT_ERROR = 1 # Export could not be written, or an unexpected error occurred
+EXIT_USAGE = 2 # Bad arguments or folder (argparse also uses 2)
+EXIT_NO_DATA = 3 # No matching .wpd files or no records extracted
+EXIT_PARSE_ERRORS = 4 # Export written, but some files could not be read
+
+def build_arg_parser():
+    """Creates the argument parser for headless batch runs."""
+    parser = argparse.ArgumentParser(
+        description="Export IESVE/Radiance daylight metrics from .wpd files to Excel without the GUI.",
+        epilog=f"Exit codes: {EXIT_OK}=ok, {EXIT_ERROR}=export failed, {EXIT_USAGE}=usage error, "
+               f"{EXIT_NO_DATA}=no data, {EXIT_PARSE_ERRORS}=exported with unreadable files.",
+    )
+    parser.add_argument("folder", help="Radiance results folder containing .wpd files (the baseline option with --compare-with, "
+                                       "optionally as LABEL=FOLDER)")
+    parser.add_argument("-m", "--metric", action="append", dest="metrics", metavar="METRIC",
+                        help="Metric suffix to export (repeatable). Default: all metrics found in the folder")
+    parser.add_argument("-a", "--area", choices=[*AREA_TYPES, BOTH_AREAS], default="Full",
+                        help="Area statistics to export (default: Full)")
+    parser.add_argument("-o", "--output", help="Output .xlsx path. Default: Daylight_Stats_<metric>_<area>.xlsx in the folder")
+    parser.add_argument("--columnar", action="append", default=[], metavar="PATH",
+                        help="Also write all rows to a single .parquet, .arrow/.feather or .csv table with numeric "
+                             "Min/Max/Average (repeatable)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="Number of parse worker processes (default: one per CPU core)")
+    parser.add_argument("--grid-stats", action="store_true",
+                        help="Also compute uniformity, percent-of-area and percentiles from the [Data] sensor grid")
+    parser.add_argument("--grid-threshold", type=float, action="append", dest="grid_thresholds", metavar="VALUE",
+                        help=f"Threshold for the percent-of-area column (repeatable, implies --grid-stats). Default: {', '.join(map(str, DEFAULT_GRID_THRESHOLDS))}")
+    parser.add_argument("--grid-percentile", type=float, action="append", dest="grid_percentiles", metavar="P",
+                        help=f"Percentile to report (repeatable, implies --grid-stats). Default: {', '.join(map(str, DEFAULT_GRID_PERCENTILES))}")
+    parser.add_argument("--parser", choices=PARSER_BACKENDS, default="auto", dest="backend",
+                        help="File reader: 'stream' (text), 'mmap' (byte-level search for very large files) "
+                             f"or 'auto' (mmap for files of {MMAP_MIN_FILE_SIZE // (1024 * 1024)} MB or more). Default: auto")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and update the outputs as .wpd files are added or rewritten (Ctrl+C to stop)")
+    parser.add_argument("--settle", type=float, default=WATCH_SETTLE_SECONDS, metavar="SECONDS",
+                        help=f"Watch mode: seconds a file must stay unchanged before it is read (default: {WATCH_SETTLE_SECONDS:g})")
+    parser.add_argument("--poll-interval", type=float, default=WATCH_POLL_SECONDS, metavar="SECONDS",
+                        help=f"Watch mode: seconds between checks (default: {WATCH_POLL_SECONDS:g})")
+    parser.add_argument("--compare-with", action="append", default=[], metavar="[LABEL=]FOLDER",
+                        help="Compare design options: results folder of another option (repeatable). Writes one table per "
+                             "metric/area keyed on Room ID and metric description, with deltas against the first folder")
+    parser.add_argument("--target", action="append", default=[], dest="targets", metavar="[METRIC=]VALUE",
+                        help="Comparison pass mark, e.g. 2 or DF=2 (repeatable). Adds Pass/Fail per option and its change")
+    parser.add_argument("--target-stat", default="Average", metavar="COLUMN",
+                        help="Column the --target applies to, e.g. Average, Min or a grid column (default: Average)")
+    parser.add_argument("--report", metavar="PATH",
+                        help="Write a run report with per-file size, parse time, block count and status plus "
+                             "scan/parse/export timings (.json, or .csv for the per-file table)")
+    parser.add_argument("--no-cache", action="store_true", help="Parse every file, ignoring the parse cache")
+    parser.add_argument("--purge-cache", action="store_true", help="Delete the parse cache before running")
+    parser.add_argument("--list-metrics", action="store_true", help="Print the metrics found in the folder and exit")
+    return parser
+
+def _grid_options_from_args(args):
+    """GridOptions for the CLI flags, or None if grid analytics were not requested."""
+    if args.grid_stats or args.grid_thresholds or args.grid_percentiles:
+        return GridOptions(tuple(args.grid_thresholds or DEFAULT_GRID_THRESHOLDS),
+                           tuple(args.grid_percentiles or DEFAULT_GRID_PERCENTILES))
+    return None
+
+def _option_spec(text):
+    """Splits a LABEL=FOLDER design option argument; the label defaults to the folder name."""
+    label, sep, folder = text.partition("=")
+    if not sep or os.path.isdir(text) or not label or os.sep in label or "/" in label:
+        folder = text
+        label = os.path.basename(os.path.normpath(text)) or text
+    return label, folder
+
+def _parse_targets(target_args):
+    """{metric or None: pass mark} from --target values. Raises ValueError for a bad value."""
+    targets = {}
+    for text in target_args:
+        metric_type, sep, value = text.rpartition("=")
+        try:
+            targets[metric_type if sep else None] = float(value)
+        except ValueError:
+            raise ValueError(f"Invalid --target '{text}'. Use VALUE or METRIC=VALUE, e.g. DF=2") from None
+    return targets
+
+def _cli_compare(args):
+    """Design option comparison for cli_main: one merged table per metric/area across several folders."""
+    options = [_option_spec(args.folder)] + [_option_spec(text) for text in args.compare_with]
+    labels = [label for label, _ in options]
+    if len(set(labels)) != len(labels):
+        print(f"Error: Design option labels must be unique: {', '.join(labels)}. Use LABEL=FOLDER to name them.", file=sys.stderr)
+        return EXIT_USAGE
+    for _, folder in options:
+        if not os.path.isdir(folder):
+            print(f"Error: Folder not found: {folder}", file=sys.stderr)
+            return EXIT_USAGE
+    try:
+        targets = _parse_targets(args.targets)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    grid_options = _grid_options_from_args(args)
+    value_columns = numeric_stats_columns(grid_options)
+    if targets and args.target_stat not in value_columns:
+        print(f"Error: --target-stat must be one of: {', '.join(value_columns)}", file=sys.stderr)
+        return EXIT_USAGE
+
+    available_by_folder = {folder: get_available_metrics_from_files(folder) for _, folder in options}
+    available_metrics = sorted(set().union(*available_by_folder.values()))
+    metric_types = args.metrics or available_metrics
+    unknown = [metric_type for metric_type in metric_types if metric_type not in available_metrics]
+    if unknown or not metric_types:
+        print(f"Error: Metric(s) not found in any folder: {', '.join(unknown) or 'none'}. Available: {', '.join(available_metrics) or 'none'}",
+              file=sys.stderr)
+        return EXIT_USAGE if unknown else EXIT_NO_DATA
+    area_types = AREA_TYPES if args.area == BOTH_AREAS else (args.area,)
+    columns = stats_columns(grid_options)
+
+    print(f"Comparing design options {', '.join(labels)} for Metric(s): {', '.join(metric_types)}, Area: '{args.area}'...")
+    collectors = []
+    failed_files = []
+    try:
+        for label, folder in options:
+            print(f"\n[{label}] {folder}")
+            if args.purge_cache and purge_parse_cache(folder):
+                print("Parse cache purged.")
+            collector = BatchCollector()
+            option_metrics = [metric_type for metric_type in metric_types if metric_type in available_by_folder[folder]]
+            _, _, option_failed = collect_stats(folder, option_metrics, area_types, [collector], workers=args.workers,
+                                                use_cache=not args.no_cache, grid_options=grid_options, backend=args.backend)
+            collectors.append(collector)
+            failed_files += option_failed
+    except Exception as e:
+        print(f"Error: Parsing failed: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    sheet_keys = [(metric_type, area_type) for metric_type in metric_types for area_type in area_types]
+    with_pass = bool(targets)
+    writer = StreamingExcelWriter(sheet_keys, comparison_columns(labels, value_columns, with_pass))
+    for key in sheet_keys:
+        option_frames = [(label, build_stats_dataframe(collector.batches.get(key, []), columns))
+                         for label, collector in zip(labels, collectors)]
+        target = targets.get(key[0], targets.get(None))
+        comparison = compare_design_options(option_frames, value_columns, target, args.target_stat)
+        if len(comparison):
+            writer.write_columns(key, frame_to_columns(comparison))
+    if not writer.total_rows():
+        writer.discard()
+        print("Error: No data extracted. Check files and settings.", file=sys.stderr)
+        return EXIT_NO_DATA
+
+    excel_file_path = args.output
+    if not excel_file_path:
+        metric_label = metric_types[0] if len(metric_types) == 1 else "All"
+        excel_file_path = os.path.join(options[0][1], f"Daylight_Compare_{metric_label}_{args.area}.xlsx")
+    try:
+        writer.save(excel_file_path)
+    except Exception as e:
+        print(f"Error saving Excel file: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    print(f"\nComparison of {len(options)} design options exported to {excel_file_path}")
+
+    if failed_files:
+        print(f"Warning: {len(failed_files)} file(s) could not be read:", file=sys.stderr)
+        for file_path in failed_files:
+            print(f"  {file_path}", file=sys.stderr)
+        return EXIT_PARSE_ERRORS
+    return EXIT_OK
+
+def _cli_watch(args):
+    """Watch mode for cli_main. Metrics may not exist yet when watching a run in progress."""
+    for columnar_path in args.columnar:
+        if os.path.splitext(columnar_path)[1].lower() not in COLUMNAR_FORMATS:
+            print(f"Error: Unsupported columnar output '{columnar_path}'. Use one of: {', '.join(COLUMNAR_FORMATS)}", file=sys.stderr)
+            return EXIT_USAGE
+    area_types = AREA_TYPES if args.area == BOTH_AREAS else (args.area,)
+    excel_file_path = args.output
+    if not excel_file_path:
+        metric_label = args.metrics[0] if args.metrics and len(args.metrics) == 1 else "All"
+        excel_file_path = os.path.join(args.folder, f"Daylight_Stats_{metric_label}_{args.area}.xlsx")
+    try:
+        watch_folder(args.folder, args.metrics, area_types, excel_file_path, args.columnar, workers=args.workers,
+                     use_cache=not args.no_cache, grid_options=_grid_options_from_args(args), backend=args.backend,
+                     settle_seconds=args.settle, poll_interval=args.poll_interval)
+    except Exception as e:
+        print(f"Error: Watch mode failed: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    return EXIT_OK
+
+def cli_main(argv=None):
+    """Headless entry point for scheduled runs. Returns a process exit code."""
+    args = build_arg_parser().parse_args(argv)
+    if args.compare_with:
+        if args.watch or args.columnar or args.list_metrics:
+            print("Error: --compare-with cannot be combined with --watch, --columnar or --list-metrics", file=sys.stderr)
+            return EXIT_USAGE
+        return _cli_compare(args)
+    radiance_folder = args.folder
+    if not os.path.isdir(radiance_folder):
+        print(f"Error: Folder not found: {radiance_folder}", file=sys.stderr)
+        return EXIT_USAGE
+
+    if args.purge_cache and purge_parse_cache(radiance_folder):
+        print("Parse cache purged.")
+
+    available_metrics = get_available_metrics_from_files(radiance_folder)
+    if args.list_metrics:
+        print("\n".join(available_metrics))
+        return EXIT_OK if available_metrics else EXIT_NO_DATA
+    if args.watch:
+        return _cli_watch(args)
+    if not available_metrics:
+        print(f"Error: No .wpd files or metric types found in {radiance_folder}", file=sys.stderr)
+        return EXIT_NO_DATA
+
+    metric_types = args.metrics or available_metrics
+    unknown = [metric_type for metric_type in metric_types if metric_type not in available_metrics]
+    if unknown:
+        print(f"Error: Metric(s) not found in folder: {', '.join(unknown)}. Available: {', '.join(available_metrics)}", file=sys.stderr)
+        return EXIT_USAGE
+    area_types = AREA_TYPES if args.area == BOTH_AREAS else (args.area,)
+    grid_options = _grid_options_from_args(args)
+    if args.report and os.path.splitext(args.report)[1].lower() not in REPORT_FORMATS:
+        print(f"Error: Unsupported report format '{args.report}'. Use one of: {', '.join(REPORT_FORMATS)}", file=sys.stderr)
+        return EXIT_USAGE
+    report = RunReport(radiance_folder)
+
+    print(f"Processing files for Metric(s): {', '.join(metric_types)}, Area: '{args.area}'...")
+    columnar_writers = []
+    try:
+        for columnar_path in args.columnar:
+            columnar_writers.append(ColumnarWriter(columnar_path, stats_columns(grid_options), numeric_stats_columns(grid_options)))
+    except (ValueError, ImportError, OSError) as e:
+        for columnar_writer in columnar_writers:
+            columnar_writer.abort()
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE if isinstance(e, ValueError) else EXIT_ERROR
+    writer = StreamingExcelWriter([(metric_type, area_type) for metric_type in metric_types for area_type in area_types],
+                                  stats_columns(grid_options))
+
+    try:
+        _, row_count, failed_files = collect_stats(radiance_folder, metric_types, area_types, [writer, *columnar_writers],
+                                                   workers=args.workers, use_cache=not args.no_cache, grid_options=grid_options,
+                                                   backend=args.backend, report=report)
+    except Exception as e:
+        writer.discard()
+        for columnar_writer in columnar_writers:
+            columnar_writer.abort()
+        print(f"Error: Parsing failed: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    if not row_count:
+        writer.discard()
+        for columnar_writer in columnar_writers:
+            columnar_writer.abort()
+        print("Error: No data extracted. Check files and settings.", file=sys.stderr)
+        return EXIT_NO_DATA
+
+    excel_file_path = args.output
+    if not excel_file_path:
+        metric_label = metric_types[0] if len(metric_types) == 1 else "All"
+        excel_file_path = os.path.join(radiance_folder, f"Daylight_Stats_{metric_label}_{args.area}.xlsx")
+    try:
+        with report.phase("export"):
+            writer.save(excel_file_path)
+    except Exception as e:
+        for columnar_writer in columnar_writers:
+            columnar_writer.abort()
+        print(f"Error saving Excel file: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    report.outputs.append(excel_file_path)
+    print(f"\nStats successfully exported to {excel_file_path}")
+    for columnar_writer in columnar_writers:
+        try:
+            with report.phase("export"):
+                columnar_writer.close()
+        except Exception as e:
+            columnar_writer.abort()
+            print(f"Error saving {columnar_writer.output_path}: {e}", file=sys.stderr)
+            return EXIT_ERROR
+        report.outputs.append(columnar_writer.output_path)
+        print(f"Stats successfully exported to {columnar_writer.output_path}")
+
+    report.print_summary()
+    if args.report:
+        try:
+            report.write(args.report)
+            print(f"Run report written to {args.report}")
+        except OSError as e:
+            print(f"Warning: Could not write run report: {e}", file=sys.stderr)
+
+    if failed_files:
+        print(f"Warning: {len(failed_files)} file(s) could not be read:", file=sys.stderr)
+        for file_path in failed_files:
+            print(f"  {file_path}", file=sys.stderr)
+        return EXIT_PARSE_ERRORS
+    return EXIT_OK
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    multiprocessing.freeze_support() # Needed for worker processes in frozen Windows builds
+    if len(sys.argv) > 1:
+        sys.exit(cli_main())
+    main()
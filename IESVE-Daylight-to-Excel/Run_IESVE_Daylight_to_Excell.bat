@@ -16,6 +16,7 @@ set "SCRIPT_PATH=%~dp0%SCRIPT_NAME%"
 set "VENV_PATH=%~dp0.venv_daylight_excel"
 set "PY_EXE=%VENV_PATH%\Scripts\python.exe"
 set "REQ_FILE=%~dp0requirements.txt"
+set "REQ_STAMP=%VENV_PATH%\requirements.installed.txt"
 
 echo [INFO] Working Directory: "%CD%"
 echo [INFO] Script Path: "%SCRIPT_PATH%"
@@ -48,7 +49,16 @@ if not exist "%PY_EXE%" (
   )
 )
 
-REM ---- Install/update Python packages ----
+REM ---- Install/update Python packages (skipped when requirements.txt is unchanged) ----
+set "NEED_INSTALL=1"
+if exist "%REQ_FILE%" if exist "%REQ_STAMP%" (
+  fc /b "%REQ_FILE%" "%REQ_STAMP%" >nul 2>nul && set "NEED_INSTALL="
+)
+if not defined NEED_INSTALL (
+  echo [INFO] Packages are up to date; skipping pip. Delete "%REQ_STAMP%" to force a reinstall.
+  goto :LAUNCH
+)
+
 echo [INFO] Installing/updating required packages...
 if exist "%REQ_FILE%" (
   "%PY_EXE%" -m pip install --upgrade pip
@@ -63,7 +73,9 @@ if %errorlevel% neq 0 (
   echo [ERROR] Failed to install Python packages. Check your internet connection and package names.
   goto :END
 )
+if exist "%REQ_FILE%" copy /y "%REQ_FILE%" "%REQ_STAMP%" >nul
 
+:LAUNCH
 echo [INFO] Launching the Python application...
 "%PY_EXE%" -u "%SCRIPT_PATH%"
 set "RC=%errorlevel%"
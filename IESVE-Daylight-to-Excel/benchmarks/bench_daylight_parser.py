@@ -0,0 +1,222 @@
+"""
+bench_daylight_parser.py — Benchmark the .wpd parser and Excel export.
+
+For each folder size, synthetic .wpd files are generated (and reused on later runs), then a
+fresh Python process scans, parses and exports them so peak memory is measured cleanly.
+Reports files/s, MB/s, peak RSS and export time, and appends one JSON line per case to the
+results file together with the git commit, so numbers can be compared across commits.
+
+Usage:
+  python bench_daylight_parser.py --sizes 10 100 1000 10000 --grid 20 20 --workers 0
+  python bench_daylight_parser.py --sizes 1000 --compare
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.dirname(HERE)) # The exporter script lives one level up
+
+from make_synthetic_wpd import generate_folder
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+DEFAULT_RESULTS = os.path.join(HERE, "results", "daylight_bench.jsonl")
+METRIC = "DF"
+
+
+def peak_rss_mb():
+    """Returns (this process, largest child process) peak RSS in MB. Children are None on Windows."""
+    try:
+        import resource
+    except ImportError:
+        return _windows_peak_rss_mb(), None
+    scale = 1 if sys.platform == "darwin" else 1024 # ru_maxrss is bytes on macOS, KB elsewhere
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale / 1e6
+    return own, children or None
+
+
+def _windows_peak_rss_mb():
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(),
+                                             ctypes.byref(counters), counters.cb)
+    return counters.PeakWorkingSetSize / 1e6
+
+
+def git_commit():
+    """Short commit hash of the working tree, with '+dirty' if it has local changes, or None."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--", ".."], cwd=HERE, capture_output=True,
+                               text=True, check=True).stdout.strip()
+        return f"{commit}+dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_case(folder, workers, backend, area):
+    """Runs scan, parse and export in this process and returns the timings. Used by the child process."""
+    start = time.perf_counter()
+    import IESVE_Dayilght_Metrics_to_Excel as exporter
+    import_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    exporter.get_available_metrics_from_files(folder)
+    file_paths = [os.path.join(folder, filename) for filename in os.listdir(folder)
+                  if filename.endswith(f"_{METRIC}.wpd")]
+    total_bytes = sum(os.path.getsize(file_path) for file_path in file_paths)
+    scan_s = time.perf_counter() - start
+
+    area_types = exporter.AREA_TYPES if area == exporter.BOTH_AREAS else (area,)
+    writer = exporter.StreamingExcelWriter([(METRIC, area_type) for area_type in area_types])
+    start = time.perf_counter()
+    export_s = 0.0
+    rows = 0
+    for _, area_stats in exporter.parse_wpd_files(file_paths, METRIC, area_types, workers=workers, backend=backend):
+        export_start = time.perf_counter()
+        for area_type, batch in area_stats.items():
+            writer.write_columns((METRIC, area_type), batch)
+            rows += exporter.batch_length(batch)
+        export_s += time.perf_counter() - export_start
+    parse_s = time.perf_counter() - start - export_s
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        writer.save(os.path.join(tmp, "bench.xlsx"))
+        export_s += time.perf_counter() - start
+
+    peak_main, peak_workers = peak_rss_mb()
+    return {
+        "files": len(file_paths),
+        "rows": rows,
+        "total_mb": round(total_bytes / 1e6, 3),
+        "import_s": round(import_s, 4),
+        "scan_s": round(scan_s, 4),
+        "parse_s": round(parse_s, 4),
+        "export_s": round(export_s, 4),
+        "files_per_s": round(len(file_paths) / parse_s, 1) if parse_s else None,
+        "mb_per_s": round(total_bytes / 1e6 / parse_s, 2) if parse_s else None,
+        "peak_rss_mb": round(peak_main, 1),
+        "peak_rss_workers_mb": round(peak_workers, 1) if peak_workers else None,
+    }
+
+
+def ensure_folder(workdir, files, sims, grid, aoi):
+    """Generates the synthetic folder for a case once; later runs reuse it."""
+    folder = os.path.join(workdir, f"wpd_{files}f_{sims}s_{grid[0]}x{grid[1]}_{'aoi' if aoi else 'full'}")
+    marker = os.path.join(folder, ".complete")
+    if not os.path.exists(marker):
+        print(f"Generating {files} files in {folder} ...")
+        generate_folder(folder, files=files, sims=sims, grid=grid, aoi=aoi, metrics=(METRIC,))
+        open(marker, "w").close()
+    return folder
+
+
+def load_results(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def case_key(record):
+    return (record["files"], record["sims"], tuple(record["grid"]), record["aoi"], record["workers"],
+            record["backend"], record["area"])
+
+
+def print_comparison(record, history):
+    """Prints the change against the most recent run of the same case from another commit."""
+    previous = [old for old in history if case_key(old) == case_key(record) and old.get("commit") != record.get("commit")]
+    if not previous:
+        print("    (no earlier commit to compare with)")
+        return
+    old = previous[-1]
+    for field in ("files_per_s", "mb_per_s", "export_s", "peak_rss_mb"):
+        if old.get(field) and record.get(field) is not None:
+            change = (record[field] - old[field]) / old[field] * 100
+            print(f"    {field:>12}: {old[field]} -> {record[field]} ({change:+.1f}% vs {old.get('commit')})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the daylight .wpd parser and export.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Folder sizes (file counts)")
+    parser.add_argument("--sims", type=int, default=2, help="[Sim] blocks per file")
+    parser.add_argument("--grid", type=int, nargs=2, default=(20, 20), metavar=("NX", "NY"), help="Sensor grid size")
+    parser.add_argument("--no-aoi", action="store_true", help="Generate files without AOI stats")
+    parser.add_argument("--area", default="Full", choices=["Full", "AOI", "Both"])
+    parser.add_argument("--workers", type=int, default=0, help="Parse workers (0 = one per CPU core, 1 = serial)")
+    parser.add_argument("--backend", default="auto", choices=["auto", "stream", "mmap"])
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "daylight_bench"),
+                        help="Where synthetic folders are generated and kept")
+    parser.add_argument("--output", default=DEFAULT_RESULTS, help="JSON-lines file the results are appended to")
+    parser.add_argument("--compare", action="store_true", help="Show the change against the last run from another commit")
+    parser.add_argument("--run-case", metavar="FOLDER", help=argparse.SUPPRESS) # Internal: child process mode
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, args.workers, args.backend, args.area)))
+        return
+
+    grid = tuple(args.grid)
+    aoi = not args.no_aoi
+    commit = git_commit()
+    history = load_results(args.output)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+
+    for files in args.sizes:
+        folder = ensure_folder(args.workdir, files, args.sims, grid, aoi)
+        child = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run-case", folder, "--workers", str(args.workers),
+             "--backend", args.backend, "--area", args.area],
+            capture_output=True, text=True,
+        )
+        if child.returncode != 0:
+            print(child.stderr, file=sys.stderr)
+            sys.exit(f"Benchmark case with {files} files failed.")
+        result = json.loads(child.stdout.strip().splitlines()[-1])
+        record = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": commit,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sims": args.sims,
+            "grid": list(grid),
+            "aoi": aoi,
+            "workers": args.workers,
+            "backend": args.backend,
+            "area": args.area,
+            **result,
+        }
+        print(f"{files:>6} files | {record['total_mb']:>8.1f} MB | parse {record['parse_s']:>7.2f}s "
+              f"({record['files_per_s']} files/s, {record['mb_per_s']} MB/s) | export {record['export_s']:.2f}s | "
+              f"peak RSS {record['peak_rss_mb']} MB (workers {record['peak_rss_workers_mb']} MB)")
+        if args.compare:
+            print_comparison(record, history)
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    print(f"Results appended to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+bench_startup.py — Measure the cold-start time of the daylight exporter.
+
+Starts fresh Python processes that import the exporter script (as the .bat launcher does
+before the first dialog) and reports the process wall time, the time spent importing the
+script and which heavy libraries were loaded by the import. If a display is available, the
+time until a Tk root window is ready is measured too. With --folder, the step between the
+folder and metric dialogs is timed as well (results folder -> metric list, as main() does it),
+along with how many times the folder was listed. One JSON line per run is appended to the
+results file together with the git commit, so numbers can be tracked across commits.
+
+Usage:
+  python bench_startup.py --runs 10
+  python bench_startup.py --folder D:\\tmp\\wpd --compare
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+from bench_daylight_parser import git_commit, load_results
+
+DEFAULT_RESULTS = os.path.join(HERE, "results", "startup_bench.jsonl")
+HEAVY_MODULES = ("numpy", "pandas", "openpyxl", "pyarrow", "tkinter")
+
+# Runs in the child process; the script folder is passed as argv[1]
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import IESVE_Dayilght_Metrics_to_Excel
+import_s = time.perf_counter() - start
+tk_s = None
+try:
+    import tkinter
+    root = tkinter.Tk()
+    root.withdraw()
+    root.update()
+    tk_s = time.perf_counter() - start
+    root.destroy()
+except Exception:
+    pass
+loaded = [name for name in sys.argv[2].split(",") if name in sys.modules and name != "tkinter"]
+metric_list_s = listings = None
+if sys.argv[3]:
+    import os
+    exporter = IESVE_Dayilght_Metrics_to_Excel
+    listings = 0
+    def counted(listing):
+        def wrapper(*args, **kwargs):
+            global listings
+            listings += 1
+            return listing(*args, **kwargs)
+        return wrapper
+    os.listdir, os.scandir = counted(os.listdir), counted(os.scandir)
+    step_start = time.perf_counter()
+    scan = exporter.FolderScan(sys.argv[3])
+    scan.start()
+    scan.metric_types()
+    metric_list_s = time.perf_counter() - step_start
+    scan.file_paths([]) # The export reuses the listing; count any second one
+print(json.dumps({"import_s": import_s, "first_window_s": tk_s, "loaded": loaded,
+                  "metric_list_s": metric_list_s, "folder_listings": listings}))
+"""
+
+
+def run_once(folder=None):
+    """One cold start in a fresh process. Returns the probe result plus the process wall time."""
+    start = time.perf_counter()
+    child = subprocess.run([sys.executable, "-c", PROBE, os.path.dirname(HERE), ",".join(HEAVY_MODULES), folder or ""],
+                           capture_output=True, text=True)
+    wall_s = time.perf_counter() - start
+    if child.returncode != 0:
+        print(child.stderr, file=sys.stderr)
+        sys.exit("Startup probe failed.")
+    result = json.loads(child.stdout.strip().splitlines()[-1])
+    result["wall_s"] = wall_s
+    return result
+
+
+def median_ms(values):
+    values = [value for value in values if value is not None]
+    return round(statistics.median(values) * 1000, 1) if values else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the daylight exporter cold start.")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh processes to start (the median is reported)")
+    parser.add_argument("--output", default=DEFAULT_RESULTS, help="JSON-lines file the results are appended to")
+    parser.add_argument("--folder", help="Results folder to time the folder -> metric list step on")
+    parser.add_argument("--compare", action="store_true", help="Show the change against the last run from another commit")
+    args = parser.parse_args()
+
+    run_once(args.folder) # Warm the OS file cache so the runs are comparable; the interpreter itself still starts cold
+    runs = [run_once(args.folder) for _ in range(args.runs)]
+    record = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": args.runs,
+        "wall_ms": median_ms([run["wall_s"] for run in runs]),
+        "import_ms": median_ms([run["import_s"] for run in runs]),
+        "first_window_ms": median_ms([run["first_window_s"] for run in runs]),
+        "loaded_on_import": runs[-1]["loaded"],
+        "folder": args.folder,
+        "metric_list_ms": median_ms([run["metric_list_s"] for run in runs]),
+        "folder_listings": runs[-1]["folder_listings"],
+    }
+    print(f"Cold start (median of {args.runs}): process {record['wall_ms']} ms | import {record['import_ms']} ms | "
+          f"first Tk window {str(record['first_window_ms']) + ' ms' if record['first_window_ms'] is not None else 'n/a (no display)'}")
+    print(f"Loaded by the import: {', '.join(record['loaded_on_import']) or 'none of ' + ', '.join(HEAVY_MODULES[:-1])}")
+    if args.folder:
+        print(f"Folder -> metric list: {record['metric_list_ms']} ms, folder listed {record['folder_listings']} time(s)")
+
+    if args.compare:
+        previous = [old for old in load_results(args.output) if old.get("commit") != record["commit"]]
+        if previous:
+            old = previous[-1]
+            for field in ("wall_ms", "import_ms", "first_window_ms", "metric_list_ms"):
+                if old.get(field) and record[field] is not None:
+                    change = (record[field] - old[field]) / old[field] * 100
+                    print(f"  {field:>15}: {old[field]} -> {record[field]} ({change:+.1f}% vs {old.get('commit')})")
+        else:
+            print("  (no earlier commit to compare with)")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"Results appended to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+make_synthetic_wpd.py — Generate realistic synthetic IESVE/Radiance .wpd files for benchmarks.
+
+Each file looks like a room result: a header, a [Zone] line and a number of [Sim] blocks,
+each with a metric description, [NxNy]/[XYZ] grid info, a [Data] sensor grid and an
+[MMA] line (Full min/max/avg, optionally followed by AOI stats).
+
+Usage:
+  python make_synthetic_wpd.py OUT_FOLDER --files 1000 --sims 2 --grid 40 40 --metrics DF DA
+"""
+
+import os
+import argparse
+import random
+
+
+def write_wpd_file(file_path, room_id, room_name, sims=2, grid=(20, 20), aoi=True, rng=None):
+    """Writes one synthetic .wpd file. Returns its size in bytes."""
+    rng = rng or random.Random()
+    nx, ny = grid
+    with open(file_path, "w", encoding="utf-8", newline="\n") as f:
+        f.write("[RADIANCE] Synthetic results\n[Date] 2025-01-01\n[Geometry] synthetic.mod\n[Location] London\n")
+        f.write(f"[Zone] [{room_id}] {room_name}\n")
+        for sim in range(sims):
+            values = [rng.uniform(0.0, 6.0) for _ in range(nx * ny)]
+            f.write("[Sim]\n")
+            f.write(f"[Daylight Factor] Daylight factor, sim {sim + 1}\n")
+            f.write("[Stat] 1\n[Period] 0 8760\n")
+            f.write(f"[NxNy] {nx} {ny}\n[XYZ] 0.000 0.000 0.850 0.500 0.500\n[Data]\n")
+            for row in range(ny):
+                f.write(" ".join(f"{value:.3f}" for value in values[row * nx:(row + 1) * nx]) + "\n")
+            full_min, full_max, full_avg = min(values), max(values), sum(values) / len(values)
+            mma = f"{full_min:.3f} {full_max:.3f} {full_avg:.3f} {full_min / full_avg:.3f} 100.0"
+            if aoi:
+                aoi_values = values[: max(1, len(values) * 3 // 4)]
+                mma += f" {min(aoi_values):.3f} {max(aoi_values):.3f} {sum(aoi_values) / len(aoi_values):.3f}"
+            f.write(f"[MMA] {mma}\n")
+    return os.path.getsize(file_path)
+
+
+def generate_folder(folder_path, files=100, sims=2, grid=(20, 20), aoi=True, metrics=("DF",), seed=0):
+    """
+    Fills a folder with files x metrics .wpd files named RM<n>_Level1_<metric>.wpd.
+    Returns (file_count, total_bytes).
+    """
+    os.makedirs(folder_path, exist_ok=True)
+    rng = random.Random(seed)
+    total_bytes = 0
+    count = 0
+    for index in range(files):
+        room_id = f"RM{index:06d}"
+        for metric in metrics:
+            file_path = os.path.join(folder_path, f"{room_id}_Level1_{metric}.wpd")
+            total_bytes += write_wpd_file(file_path, room_id, f"Room {index}", sims, grid, aoi, rng)
+            count += 1
+    return count, total_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic .wpd files for benchmarking.")
+    parser.add_argument("folder", help="Output folder")
+    parser.add_argument("--files", type=int, default=100, help="Number of rooms (files per metric)")
+    parser.add_argument("--sims", type=int, default=2, help="[Sim] blocks per file")
+    parser.add_argument("--grid", type=int, nargs=2, default=(20, 20), metavar=("NX", "NY"), help="Sensor grid size")
+    parser.add_argument("--no-aoi", action="store_true", help="Write [MMA] lines without AOI stats")
+    parser.add_argument("--metrics", nargs="+", default=["DF"], help="Metric suffixes to generate")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    count, total_bytes = generate_folder(args.folder, args.files, args.sims, tuple(args.grid),
+                                         not args.no_aoi, tuple(args.metrics), args.seed)
+    print(f"Wrote {count} files ({total_bytes / 1e6:.1f} MB) to {args.folder}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 @echo off
 setlocal EnableExtensions
 set "SCRIPT_DIR=%~dp0"
-set "SCRIPT_NAME=lockpdf_gui_qt.py"
+set "SCRIPT_NAME=lockpdf_instance.py"
 set "SCRIPT=%SCRIPT_DIR%%SCRIPT_NAME%"
 set "VENV=%SCRIPT_DIR%.venv_pdf_locker"
 set "VENV_PY=%VENV%\Scripts\python.exe"
@@ -0,0 +1,243 @@
+"""
+bench_lockpdf.py — Benchmark pdf-locker encryption throughput and memory.
+
+For each input (kind x page count) a synthetic PDF is generated with pikepdf (and reused
+on later runs). Each case then runs in a fresh Python process, so peak memory is measured
+cleanly, and saves the input --repeat times:
+  - path "open": open-password mode; path "nocopy": no-copy/print permissions
+  - cipher "aes256" is lockpdf_core.protect_pdf itself (Encryption R=6, what the app uses);
+    "aes128" (R=4), "rc4" (R=3, 128-bit) and "none" (plain save) use the same open/save
+    options with only the Encryption swapped, for comparison
+
+Reports the median wall time, MB/s, pages/s and peak RSS, and appends one JSON line per case
+to the results file together with the git commit and pikepdf/qpdf versions, so numbers can
+be compared across releases.
+
+Usage:
+  python bench_lockpdf.py --pages 10 100 1000 --kinds text images --ciphers aes256 aes128 none
+  python bench_lockpdf.py --pages 1000 --kinds images --compare
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import subprocess
+import tempfile
+from typing import List, Optional, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.dirname(HERE))  # lockpdf_core.py lives one level up
+
+from make_synthetic_pdf import KINDS
+
+DEFAULT_PAGES = (10, 100, 1000)
+DEFAULT_RESULTS = os.path.join(HERE, "results", "lockpdf_bench.jsonl")
+PATHS = ("open", "nocopy")
+CIPHERS = ("aes256", "aes128", "rc4", "none")
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak RSS of this process in MB.
+    """
+    try:
+        import resource
+    except ImportError:
+        return _windows_peak_rss_mb()
+    scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is bytes on macOS, KB elsewhere
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6
+
+
+def _windows_peak_rss_mb() -> float:
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(),
+                                             ctypes.byref(counters), counters.cb)
+    return counters.PeakWorkingSetSize / 1e6
+
+
+def git_commit() -> Optional[str]:
+    """
+    Short commit hash of the working tree, with '+dirty' if pdf-locker has local changes, or None.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--", ".."], cwd=HERE, capture_output=True,
+                               text=True, check=True).stdout.strip()
+        return f"{commit}+dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_case(in_path: str, path: str, cipher: str, repeat: int) -> dict:
+    """
+    Save in_path `repeat` times and return the timings. Used by the child process.
+    """
+    import pikepdf
+    from pikepdf import Encryption
+    from lockpdf_core import ProtectionSettings, protect_pdf
+
+    settings = ProtectionSettings(owner="bench-owner", user="bench-user" if path == "open" else "",
+                                  mode_open=path == "open")
+
+    def save(out_path: str) -> None:
+        if cipher == "aes256":
+            protect_pdf(in_path, out_path, settings)  # The app's own code path
+            return
+        encryption = None
+        if cipher != "none":
+            encryption = Encryption(owner=settings.owner, user=settings.user, allow=settings.permissions(),
+                                    R=4 if cipher == "aes128" else 3, aes=cipher == "aes128",
+                                    metadata=cipher == "aes128")  # R=3 cannot flag metadata encryption
+        with pikepdf.open(in_path, **settings.save.open_kwargs()) as pdf:
+            pdf.save(out_path, encryption=encryption or False, **settings.save.save_kwargs())
+
+    times = []
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = os.path.join(tmp, "out.pdf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            save(out_path)
+            times.append(time.perf_counter() - start)
+        output_bytes = os.path.getsize(out_path)
+
+    with pikepdf.open(in_path) as pdf:
+        pages = len(pdf.pages)
+    input_mb = os.path.getsize(in_path) / 1e6
+    wall_s = statistics.median(times)
+    return {
+        "pages": pages,
+        "input_mb": round(input_mb, 3),
+        "output_mb": round(output_bytes / 1e6, 3),
+        "wall_s": round(wall_s, 4),
+        "min_s": round(min(times), 4),
+        "mb_per_s": round(input_mb / wall_s, 2) if wall_s else None,
+        "pages_per_s": round(pages / wall_s, 1) if wall_s else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "pikepdf": pikepdf.__version__,
+        "qpdf": pikepdf.__libqpdf_version__,
+    }
+
+
+def ensure_input(workdir: str, kind: str, pages: int, image_kb: int) -> str:
+    """
+    Generate the synthetic input for a case once; later runs reuse it. This runs in a child
+    process too: on Linux a child inherits its parent's peak RSS, so building large inputs
+    here would inflate every measurement.
+    """
+    suffix = f"_{image_kb}kb" if kind != "text" else ""
+    in_path = os.path.join(workdir, f"{kind}_{pages}p{suffix}.pdf")
+    if not os.path.exists(in_path):
+        print(f"Generating {in_path} ...")
+        subprocess.run([sys.executable, os.path.join(HERE, "make_synthetic_pdf.py"), in_path + ".partial",
+                        "--pages", str(pages), "--kind", kind, "--image-kb", str(image_kb)], check=True)
+        os.replace(in_path + ".partial", in_path)
+    return in_path
+
+
+def load_results(path: str) -> List[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def case_key(record: dict) -> Tuple:
+    return (record["kind"], record["pages"], record.get("image_kb"), record["path"], record["cipher"])
+
+
+def print_comparison(record: dict, history: List[dict]) -> None:
+    """
+    Print the change against the most recent run of the same case from another commit.
+    """
+    previous = [old for old in history if case_key(old) == case_key(record) and old.get("commit") != record.get("commit")]
+    if not previous:
+        print("    (no earlier commit to compare with)")
+        return
+    old = previous[-1]
+    for field in ("wall_s", "mb_per_s", "peak_rss_mb"):
+        if old.get(field) and record.get(field) is not None:
+            change = (record[field] - old[field]) / old[field] * 100
+            print(f"    {field:>11}: {old[field]} -> {record[field]} ({change:+.1f}% vs {old.get('commit')})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark pdf-locker encryption throughput and memory.")
+    parser.add_argument("--pages", type=int, nargs="+", default=list(DEFAULT_PAGES), help="Page counts")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=["text", "images"], help="Synthetic content")
+    parser.add_argument("--image-kb", type=int, default=256, help="Raw size of each page image (images/mixed)")
+    parser.add_argument("--paths", nargs="+", choices=PATHS, default=list(PATHS), help="Protection modes to time")
+    parser.add_argument("--ciphers", nargs="+", choices=CIPHERS, default=["aes256", "aes128", "none"],
+                        help="aes256 is the app's path; the others are for comparison")
+    parser.add_argument("--repeat", type=int, default=3, help="Saves per case (the median is reported)")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "lockpdf_bench"),
+                        help="Where synthetic PDFs are generated and kept")
+    parser.add_argument("--output", default=DEFAULT_RESULTS, help="JSON-lines file the results are appended to")
+    parser.add_argument("--compare", action="store_true", help="Show the change against the last run from another commit")
+    parser.add_argument("--run-case", nargs=3, metavar=("PDF", "PATH", "CIPHER"), help=argparse.SUPPRESS)  # Child mode
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(*args.run_case, repeat=args.repeat)))
+        return
+
+    commit = git_commit()
+    history = load_results(args.output)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+
+    for kind in args.kinds:
+        for pages in args.pages:
+            in_path = ensure_input(args.workdir, kind, pages, args.image_kb)
+            for path in args.paths:
+                for cipher in args.ciphers:
+                    child = subprocess.run(
+                        [sys.executable, os.path.abspath(__file__), "--run-case", in_path, path, cipher,
+                         "--repeat", str(args.repeat)],
+                        capture_output=True, text=True,
+                    )
+                    if child.returncode != 0:
+                        print(child.stderr, file=sys.stderr)
+                        sys.exit(f"Benchmark case {kind}/{pages}/{path}/{cipher} failed.")
+                    result = json.loads(child.stdout.strip().splitlines()[-1])
+                    record = {
+                        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                        "commit": commit,
+                        "python": platform.python_version(),
+                        "platform": platform.platform(),
+                        "cpu_count": os.cpu_count(),
+                        "kind": kind,
+                        "image_kb": args.image_kb if kind != "text" else None,
+                        "path": path,
+                        "cipher": cipher,
+                        "repeat": args.repeat,
+                        **result,
+                    }
+                    print(f"{kind:>6} {pages:>6}p {record['input_mb']:>8.1f} MB | {path:>6} {cipher:>6} | "
+                          f"{record['wall_s']:>7.3f}s ({record['mb_per_s']} MB/s, {record['pages_per_s']} pages/s) | "
+                          f"peak RSS {record['peak_rss_mb']} MB")
+                    if args.compare:
+                        print_comparison(record, history)
+                    with open(args.output, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(record) + "\n")
+
+    print(f"Results appended to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+make_synthetic_pdf.py — Generate synthetic PDFs with pikepdf for the pdf-locker benchmarks.
+
+Kinds:
+  text    one content stream per page with 60 lines of Helvetica text (like a report)
+  images  one Flate-compressed grayscale image per page (like a scan); a quarter of
+          each image is random data, so it does not compress away
+  mixed   both on every page
+
+Files are deterministic for a given seed, so runs on different commits see the same input.
+
+Usage:
+  python make_synthetic_pdf.py OUT.pdf --pages 1000 --kind images --image-kb 256
+"""
+
+import os
+import zlib
+import random
+import argparse
+
+import pikepdf
+from pikepdf import Dictionary, Name
+
+KINDS = ("text", "images", "mixed")
+IMAGE_WIDTH = 1024
+
+
+def text_content(page: int, rng: random.Random) -> bytes:
+    """
+    A page of text operators: 60 lines of 9 pt Helvetica.
+    """
+    lines = [b"BT /F1 9 Tf 40 770 Td 11 TL"]
+    for line in range(60):
+        words = " ".join(rng.choice(("daylight", "report", "level", "zone", "value", "summary", "area"))
+                         for _ in range(12))
+        lines.append(f"(Page {page + 1} line {line + 1}: {words}) '".encode("ascii"))
+    lines.append(b"ET")
+    return b"\n".join(lines)
+
+
+def image_stream(pdf: pikepdf.Pdf, image_kb: int, rng: random.Random) -> pikepdf.Stream:
+    """
+    A grayscale image of about image_kb KB raw, stored Flate-compressed as a
+    scanner would. A quarter of the pixels are random, the rest flat.
+    """
+    raw_size = max(IMAGE_WIDTH, image_kb * 1024)
+    noise = rng.getrandbits(raw_size // 4 * 8).to_bytes(raw_size // 4, "little")
+    raw = noise + bytes(raw_size - len(noise))
+    height = len(raw) // IMAGE_WIDTH
+    image = pikepdf.Stream(pdf, zlib.compress(raw[: IMAGE_WIDTH * height], 6))
+    image.Type = Name.XObject
+    image.Subtype = Name.Image
+    image.Width = IMAGE_WIDTH
+    image.Height = height
+    image.ColorSpace = Name.DeviceGray
+    image.BitsPerComponent = 8
+    image.Filter = Name.FlateDecode
+    return image
+
+
+def build_pdf(path: str, pages: int, kind: str = "text", image_kb: int = 256, seed: int = 0) -> int:
+    """
+    Write a synthetic PDF and return its size in bytes.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"kind must be one of {', '.join(KINDS)}")
+    rng = random.Random(seed)
+    pdf = pikepdf.new()
+    font = pdf.make_indirect(Dictionary(Type=Name.Font, Subtype=Name.Type1, BaseFont=Name.Helvetica))
+    for page_index in range(pages):
+        pdf.add_blank_page(page_size=(612, 792))
+        page = pdf.pages[-1]
+        resources = Dictionary()
+        content = b""
+        if kind in ("images", "mixed"):
+            resources.XObject = Dictionary(Im0=image_stream(pdf, image_kb, rng))
+            content += b"q 612 0 0 792 0 0 cm /Im0 Do Q\n"
+        if kind in ("text", "mixed"):
+            resources.Font = Dictionary(F1=font)
+            content += text_content(page_index, rng)
+        page.Resources = resources
+        page.Contents = pdf.make_stream(content)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    pdf.save(path)
+    return os.path.getsize(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic PDF for benchmarking.")
+    parser.add_argument("output", help="PDF file to write")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--kind", choices=KINDS, default="text")
+    parser.add_argument("--image-kb", type=int, default=256, help="Raw size of each page image (images/mixed)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    size = build_pdf(args.output, args.pages, args.kind, args.image_kb, args.seed)
+    print(f"Wrote {args.output} ({args.pages} pages, {size / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+lockpdf_cli.py — Command-line front end for lockpdf_core (no Qt).
+
+Protects one PDF, several PDFs or whole folders with either an open password
+(AES-256) or viewer-enforced no-copy/print permissions, using the same code
+as the GUI. Passwords are never taken as arguments (they would show up in the
+process list and shell history); they come from environment variables, from
+stdin, or from an interactive prompt.
+
+Examples:
+  set LOCKPDF_OWNER_PASSWORD=...   (Windows; use export on Linux/macOS)
+  set LOCKPDF_USER_PASSWORD=...
+  python lockpdf_cli.py report.pdf
+  python lockpdf_cli.py --mode nocopy --allow-print D:\\Reports -j 8
+  printf "owner\\nuser\\n" | python lockpdf_cli.py --password-stdin a.pdf b.pdf
+  python lockpdf_cli.py report.pdf --recipients recipients.csv -o D:\\Outbox
+
+Exit codes: 0 all files protected, 1 some files failed, 2 usage error,
+3 no PDF files found.
+"""
+
+import os
+import sys
+import json
+import getpass
+import argparse
+import multiprocessing
+from dataclasses import asdict
+from typing import List, Optional, Tuple
+
+from lockpdf_core import (
+    OBJECT_STREAM_MODES,
+    MANIFEST_NAME,
+    FileResult,
+    Manifest,
+    ProtectionSettings,
+    SaveOptions,
+    collect_pdfs,
+    protect_batch,
+    protect_copies,
+    protect_file,
+    read_recipients,
+)
+
+
+OWNER_ENV = "LOCKPDF_OWNER_PASSWORD"
+USER_ENV = "LOCKPDF_USER_PASSWORD"
+
+EXIT_OK = 0  # Every file protected
+EXIT_FAILED = 1  # At least one file could not be protected
+EXIT_USAGE = 2  # Bad arguments or missing passwords (argparse also uses 2)
+EXIT_NO_INPUT = 3  # No PDF files found in the inputs
+
+
+PASSWORD_HELP = (
+    f"Passwords: owner from ${OWNER_ENV}, open password from ${USER_ENV} (names can be changed "
+    "with --owner-env/--user-env), or one per line on stdin with --password-stdin "
+    "(owner first, then the open password). If neither is set and a terminal is attached, "
+    "you are prompted."
+)
+
+
+def add_protection_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Options shared with lockpdf_daemon.py: protection mode, passwords and
+    save options.
+    """
+    parser.add_argument(
+        "--mode",
+        choices=["open", "nocopy"],
+        default="open",
+        help="open: require a password to open (default); nocopy: no password to open, "
+        "viewer-enforced restrictions",
+    )
+    parser.add_argument("--allow-copy", action="store_true", help="nocopy mode: do not block copy/extract")
+    parser.add_argument("--allow-print", action="store_true", help="nocopy mode: do not block printing")
+    parser.add_argument("--owner-env", default=OWNER_ENV, metavar="VAR", help=f"Environment variable with the owner password (default: {OWNER_ENV})")
+    parser.add_argument("--user-env", default=USER_ENV, metavar="VAR", help=f"Environment variable with the open password (default: {USER_ENV})")
+    parser.add_argument("--password-stdin", action="store_true", help="Read the owner password, then the open password, from stdin")
+    parser.add_argument("--low-memory", action="store_true", help="Memory-map the input instead of reading it through a buffer")
+    parser.add_argument(
+        "--object-streams",
+        choices=OBJECT_STREAM_MODES,
+        default="preserve",
+        help="preserve (default) keeps the input's layout; generate packs objects into "
+        "compressed object streams (smaller files); disable writes plain objects for old readers",
+    )
+    parser.add_argument("--no-compress-streams", action="store_true", help="Leave uncompressed streams uncompressed (faster, larger)")
+    parser.add_argument("--linearize", action="store_true", help="Linearize for fast web view (slower save)")
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Re-open each output after saving and check its xref/trailer, passwords, encryption level "
+        "and permissions; outputs that fail are deleted and reported as failures",
+    )
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """
+    Create the argument parser.
+    """
+    parser = argparse.ArgumentParser(
+        description="Protect PDFs with an open password (AES-256) or no-copy/print permissions.",
+        epilog=(
+            f"{PASSWORD_HELP} Exit codes: {EXIT_OK}=ok, {EXIT_FAILED}=some files failed, "
+            f"{EXIT_USAGE}=usage error, {EXIT_NO_INPUT}=no PDFs found."
+        ),
+    )
+    parser.add_argument("inputs", nargs="+", help="PDF files and/or folders of PDFs")
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Output path (single input file only). Default: *_locked.pdf / *_nocopy.pdf. "
+        "With --recipients, the folder the copies are written to (default: the input's folder)",
+    )
+    parser.add_argument("-r", "--recursive", action="store_true", help="Include PDFs in subfolders of folder inputs")
+    parser.add_argument(
+        "--skip-unchanged",
+        action="store_true",
+        help=f"Skip inputs whose content and settings match the output recorded in {MANIFEST_NAME} "
+        "(kept next to the outputs), as long as that output still opens with the given passwords",
+    )
+    parser.add_argument(
+        "--recipients",
+        metavar="CSV",
+        help="Write one copy of a single input file per CSV row (output name, open password), "
+        "parsing the input only once per worker; the owner password is shared",
+    )
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: one per CPU core)")
+    add_protection_arguments(parser)
+    parser.add_argument("--json", action="store_true", help="Print the per-file results as JSON")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only report failures")
+    return parser
+
+
+def read_passwords(args: argparse.Namespace, need_user: bool) -> Tuple[str, str]:
+    """
+    Owner and open password from stdin, the environment or a prompt.
+    Returns "" for anything not provided.
+    """
+    if args.password_stdin:
+        lines = sys.stdin.read().splitlines()
+        owner = lines[0] if lines else ""
+        user = lines[1] if need_user and len(lines) > 1 else ""
+        return owner, user
+
+    owner = os.environ.get(args.owner_env, "")
+    user = os.environ.get(args.user_env, "") if need_user else ""
+    if sys.stdin.isatty():
+        if not owner:
+            owner = getpass.getpass("Owner password: ")
+        if need_user and not user:
+            user = getpass.getpass("Open password: ")
+    return owner, user
+
+
+def settings_from_args(args: argparse.Namespace, need_user: bool = True) -> Optional[ProtectionSettings]:
+    """
+    Read the passwords and build the settings, or print an error and
+    return None. need_user=False when the open passwords come from
+    elsewhere (--recipients).
+    """
+    mode_open = args.mode == "open"
+    need_user = need_user and mode_open
+    owner, user = read_passwords(args, need_user=need_user)
+    if not owner:
+        print(f"Error: Owner password is required (set ${args.owner_env} or use --password-stdin).", file=sys.stderr)
+        return None
+    if need_user and not user:
+        print(f"Error: An open password is required in open mode (set ${args.user_env} or use --password-stdin).", file=sys.stderr)
+        return None
+
+    return ProtectionSettings(
+        owner=owner,
+        user=user,
+        mode_open=mode_open,
+        block_copy=not args.allow_copy,
+        block_print=not args.allow_print,
+        save=SaveOptions(
+            low_memory=args.low_memory,
+            object_streams=args.object_streams,
+            compress_streams=not args.no_compress_streams,
+            linearize=args.linearize,
+        ),
+    )
+
+
+def report(results: List[FileResult], as_json: bool, quiet: bool) -> None:
+    """
+    Print one line per file (failures on stderr), or the results as JSON.
+    """
+    if as_json:
+        print(json.dumps([asdict(r) for r in results], indent=2))
+        return
+    for r in results:
+        if r.skipped:
+            if not quiet:
+                print(f"SKIP  {r.src} -> {r.out} (unchanged)")
+        elif r.ok:
+            if not quiet:
+                checked = f", verified in {r.verify_seconds:.2f}s" if r.verified else ""
+                print(f"OK    {r.src} -> {r.out} ({r.seconds:.2f}s{checked})")
+        else:
+            print(f"FAIL  {r.src}: {r.error}", file=sys.stderr)
+    if not quiet:
+        done = sum(r.ok and not r.skipped for r in results)
+        skipped = sum(r.skipped for r in results)
+        print(f"Protected {done} of {len(results)} file(s)." + (f" {skipped} unchanged, skipped." if skipped else ""))
+
+
+def main_recipients(args: argparse.Namespace, files: List[str]) -> int:
+    """
+    --recipients: one open-password copy of a single input per CSV row.
+    """
+    if len(files) != 1 or os.path.isdir(args.inputs[0]):
+        print("Error: --recipients needs exactly one input file.", file=sys.stderr)
+        return EXIT_USAGE
+    if args.mode != "open" or args.skip_unchanged:
+        print("Error: --recipients only works with --mode open and without --skip-unchanged.", file=sys.stderr)
+        return EXIT_USAGE
+    out_dir = args.output or os.path.dirname(os.path.abspath(files[0]))
+    if not os.path.isdir(out_dir):
+        print(f"Error: Output folder not found: {out_dir}", file=sys.stderr)
+        return EXIT_USAGE
+    try:
+        recipients = read_recipients(args.recipients, out_dir)
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    if not recipients:
+        print(f"Error: No recipients in {args.recipients}.", file=sys.stderr)
+        return EXIT_USAGE
+
+    settings = settings_from_args(args, need_user=False)
+    if settings is None:
+        return EXIT_USAGE
+    results = protect_copies(files[0], recipients, settings, workers=args.workers, verify=args.verify)
+    report(results, args.json, args.quiet)
+    return EXIT_OK if all(r.ok for r in results) else EXIT_FAILED
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point. Returns a process exit code.
+    """
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+
+    missing = [p for p in args.inputs if not os.path.exists(p)]
+    if missing:
+        print("Error: Not found: " + ", ".join(missing), file=sys.stderr)
+        return EXIT_USAGE
+    files = collect_pdfs(args.inputs, recursive=args.recursive)
+    if not files:
+        print("Error: No PDF files found.", file=sys.stderr)
+        return EXIT_NO_INPUT
+    if args.recipients:
+        return main_recipients(args, files)
+    if args.output and (len(files) != 1 or os.path.isdir(args.inputs[0])):
+        print("Error: --output needs exactly one input file; batches are named *_locked.pdf / *_nocopy.pdf.", file=sys.stderr)
+        return EXIT_USAGE
+
+    settings = settings_from_args(args)
+    if settings is None:
+        return EXIT_USAGE
+    if args.output and args.skip_unchanged:
+        manifest = Manifest(os.path.dirname(os.path.abspath(args.output)))
+        results = [
+            protect_file(files[0], settings, args.output, track=True, previous=manifest.get(args.output), verify=args.verify)
+        ]
+        manifest.record(results[0], settings)
+        manifest.save()
+    elif args.output:
+        results = [protect_file(files[0], settings, args.output, verify=args.verify)]
+    else:
+        results = protect_batch(
+            files, settings, workers=args.workers, skip_unchanged=args.skip_unchanged, verify=args.verify
+        )
+
+    report(results, args.json, args.quiet)
+    return EXIT_OK if all(r.ok for r in results) else EXIT_FAILED
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Needed for worker processes in frozen (PyInstaller) builds
+    sys.exit(main())
@@ -0,0 +1,749 @@
+"""
+lockpdf_core.py — PDF protection core shared by the GUI and the CLI.
+
+Protects PDFs with either:
+  1) An "open" password (AES-256), or
+  2) Viewer-enforced no-copy/print permissions (opens without a password).
+
+Uses pikepdf (a Python wrapper of qpdf) only; nothing here imports Qt, so
+lockpdf_cli.py starts fast and runs on headless machines, and batch worker
+processes do not load PySide6.
+
+Notes:
+  - The "no-copy/print" option is NOT true security; it relies on PDF
+    viewers to honor permissions. Determined users can bypass it.
+  - Tested with pikepdf 9.10.2. Older/newer versions may offer additional
+    permissions, but we only use arguments supported by 9.10.2.
+"""
+
+import os
+import csv
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pikepdf
+from pikepdf import AccessMode, Encryption, ObjectStreamMode, Permissions
+
+
+OUTPUT_SUFFIXES = ("_locked.pdf", "_nocopy.pdf")  # see default_outname
+MAX_WORKERS_WINDOWS = 61  # ProcessPoolExecutor limit on Windows
+OBJECT_STREAM_MODES = ("preserve", "disable", "generate")
+ENCRYPTION_R = 6  # Security handler revision 6 -> AES-256
+MANIFEST_NAME = ".lockpdf_manifest.json"  # Kept in each output folder; see Manifest
+MANIFEST_VERSION = 1
+HASH_CHUNK_BYTES = 1024 * 1024
+RECIPIENTS_HEADER = ("output", "password")  # Optional first row of a recipients CSV
+
+
+def default_outname(src: str, mode_open: bool) -> str:
+    """
+    Suggest an output filename next to the input:
+      - *_locked.pdf for open-password mode
+      - *_nocopy.pdf for no-copy/print mode
+    """
+    root, _ = os.path.splitext(src)
+    suffix = "_locked" if mode_open else "_nocopy"
+    return f"{root}{suffix}.pdf"
+
+
+@dataclass(frozen=True)
+class SaveOptions:
+    """
+    How the protected copy is opened and written. The defaults match a plain
+    pikepdf.open() + save().
+
+    qpdf already streams the save: objects are written one at a time and
+    Flate/DCT image data is copied through without being decompressed, so
+    heap use stays flat however large the input is (see README). low_memory
+    additionally memory-maps the input instead of reading it through a
+    buffer. (pikepdf refuses stream_decode_level together with encryption,
+    so it is always left at its default.)
+    """
+
+    low_memory: bool = False  # open the input with AccessMode.mmap
+    object_streams: str = "preserve"  # preserve | disable | generate (smaller files)
+    compress_streams: bool = True  # compress streams that are stored uncompressed
+    linearize: bool = False  # "fast web view": first page displays before the download ends
+
+    def open_kwargs(self) -> dict:
+        return dict(access_mode=AccessMode.mmap) if self.low_memory else {}
+
+    def save_kwargs(self) -> dict:
+        return dict(
+            object_stream_mode=getattr(ObjectStreamMode, self.object_streams),
+            compress_streams=self.compress_streams,
+            linearize=self.linearize,
+        )
+
+
+@dataclass(frozen=True)
+class ProtectionSettings:
+    """
+    Everything needed to protect one PDF. Plain values only, so it can be
+    sent to worker processes.
+    """
+
+    owner: str
+    user: str = ""
+    mode_open: bool = True
+    block_copy: bool = True
+    block_print: bool = True
+    save: SaveOptions = SaveOptions()
+
+    def encryption(self) -> Encryption:
+        """
+        Build the pikepdf Encryption. We never pass allow=None; "allow" is only
+        set in no-copy/print mode, using Permissions arguments supported by
+        pikepdf 9.10.2 ("modify_annotation", no "assemble").
+        """
+        encryption_kwargs = dict(owner=self.owner, user=self.user, R=ENCRYPTION_R)
+        if not self.mode_open:
+            encryption_kwargs["allow"] = self.permissions()
+        return Encryption(**encryption_kwargs)
+
+    def permissions(self) -> Permissions:
+        """
+        The permissions the output should carry: pikepdf's defaults in
+        open-password mode, the chosen restrictions in no-copy/print mode.
+        """
+        if self.mode_open:
+            return Permissions()
+        return Permissions(
+            accessibility=True,
+            extract=not self.block_copy,        # block copy -> extract=False
+            print_lowres=not self.block_print,  # block print -> False
+            print_highres=not self.block_print,
+            modify_annotation=False,
+            modify_form=False,
+            modify_other=False,
+        )
+
+    def fingerprint(self) -> dict:
+        """
+        Everything except the passwords that decides what the output looks
+        like; the manifest only reuses outputs made with the same values.
+        The restriction flags do not apply in open-password mode.
+        """
+        return dict(
+            mode="open" if self.mode_open else "nocopy",
+            R=ENCRYPTION_R,
+            block_copy=None if self.mode_open else self.block_copy,
+            block_print=None if self.mode_open else self.block_print,
+            object_streams=self.save.object_streams,
+            compress_streams=self.save.compress_streams,
+            linearize=self.save.linearize,
+        )
+
+
+@dataclass
+class FileResult:
+    """
+    Outcome of protecting one file. error_type is "PasswordError" for inputs
+    that are already encrypted, "Cancelled" if the user cancelled, otherwise
+    the exception's class name. skipped is True when the manifest showed the
+    existing output is still current; sha256 is the input's content hash
+    when the run keeps a manifest. verified is True once verify_output has
+    passed ("VerificationError" if it did not).
+    """
+
+    src: str
+    out: str
+    ok: bool
+    error: str = ""
+    seconds: float = 0.0
+    error_type: str = ""
+    skipped: bool = False
+    sha256: str = ""
+    verified: bool = False
+    verify_seconds: float = 0.0
+
+
+class JobCancelled(Exception):
+    """
+    Raised from the save progress callback to abort a cancelled job.
+    """
+
+
+def file_sha256(path: str, chunk_size: int = HASH_CHUNK_BYTES) -> str:
+    """
+    SHA-256 of a file, read in chunks so large PDFs are never loaded whole.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def passwords_match(out_path: str, settings: ProtectionSettings) -> bool:
+    """
+    True if out_path opens with the settings' owner password (and, in
+    open-password mode, with the open password too). Only the trailer and
+    encryption dictionary are read, not the page content.
+    """
+    try:
+        with pikepdf.open(out_path, password=settings.owner) as pdf:
+            if not pdf.owner_password_matched:
+                return False
+        if settings.mode_open:
+            with pikepdf.open(out_path, password=settings.user) as pdf:
+                if not pdf.user_password_matched:
+                    return False
+        return True
+    except Exception:
+        return False
+
+
+PERMISSION_FLAGS = (
+    "accessibility", "extract", "modify_annotation", "modify_assembly",
+    "modify_form", "modify_other", "print_lowres", "print_highres",
+)
+
+
+def verify_output(out_path: str, settings: ProtectionSettings) -> str:
+    """
+    Re-open a written output once and check it without reading the page
+    content: the xref and trailer must parse without qpdf's recovery (a
+    truncated file has no startxref), the password must match, and the
+    revision, key length and permission flags must be the ones asked for.
+    The open password is used in open-password mode (it is what readers
+    need), the owner password otherwise. Parsing the xref is the whole
+    cost, so a second open for the other password is not worth it.
+    Returns "" if all is well, otherwise the first problem found.
+    """
+    password = settings.user if settings.mode_open else settings.owner
+    try:
+        with pikepdf.open(out_path, password=password, attempt_recovery=False) as pdf:
+            if not pdf.is_encrypted:
+                return "the output is not encrypted"
+            if not (pdf.user_password_matched if settings.mode_open else pdf.owner_password_matched):
+                return f"the {'open' if settings.mode_open else 'owner'} password does not match"
+            info = pdf.encryption
+            if info.R != ENCRYPTION_R or info.bits != 256:
+                return f"encrypted with R={info.R}/{info.bits}-bit, expected R={ENCRYPTION_R}/256-bit"
+            expected = settings.permissions()
+            wrong = [flag for flag in PERMISSION_FLAGS if getattr(pdf.allow, flag) != getattr(expected, flag)]
+            if wrong:
+                return "unexpected permissions: " + ", ".join(f"{flag}={getattr(pdf.allow, flag)}" for flag in wrong)
+            pdf.Root.Pages.get("/Count")  # Resolves the catalog and page tree root through the xref
+        return ""
+    except pikepdf.PasswordError:
+        return f"the {'open' if settings.mode_open else 'owner'} password does not open the output"
+    except Exception as e:
+        return str(e) or type(e).__name__
+
+
+class Manifest:
+    """
+    Record of the outputs in one folder: for each output file name, the
+    input it was made from (path, size, mtime, SHA-256), the settings
+    fingerprint and the output's size and mtime. Passwords are never stored;
+    a reused output is re-opened with the current passwords instead.
+    """
+
+    def __init__(self, folder: str):
+        self.path = os.path.join(folder, MANIFEST_NAME)
+        self.entries: Dict[str, dict] = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.entries = data.get("outputs", {})
+        except (OSError, ValueError, AttributeError):
+            pass  # Missing or unreadable: start empty, everything is re-encrypted
+
+    def get(self, out_path: str) -> Optional[dict]:
+        return self.entries.get(os.path.basename(out_path))
+
+    def record(self, result: FileResult, settings: ProtectionSettings) -> None:
+        """
+        Remember a successful result; failed ones drop the entry.
+        """
+        name = os.path.basename(result.out)
+        if not (result.ok and result.sha256):
+            self.entries.pop(name, None)
+            return
+        try:
+            src_stat, out_stat = os.stat(result.src), os.stat(result.out)
+        except OSError:
+            self.entries.pop(name, None)
+            return
+        self.entries[name] = dict(
+            src=os.path.abspath(result.src),
+            sha256=result.sha256,
+            size=src_stat.st_size,
+            mtime_ns=src_stat.st_mtime_ns,
+            settings=settings.fingerprint(),
+            out_size=out_stat.st_size,
+            out_mtime_ns=out_stat.st_mtime_ns,
+        )
+
+    def save(self) -> None:
+        """
+        Write the manifest atomically (temp file + rename).
+        """
+        folder = os.path.dirname(self.path) or "."
+        fd, tmp = tempfile.mkstemp(prefix=MANIFEST_NAME, suffix=".tmp", dir=folder)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "outputs": self.entries}, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+
+def output_is_current(
+    in_path: str, out_path: str, settings: ProtectionSettings, previous: Optional[dict]
+) -> Tuple[bool, str]:
+    """
+    Decide from the manifest entry whether out_path can be kept as it is.
+    Returns (current, input SHA-256). The input is only hashed when its
+    size and mtime alone cannot settle it, and the passwords are checked
+    last, so an unchanged file costs two stats and a trailer read.
+    """
+    if (
+        previous is None
+        or previous.get("settings") != settings.fingerprint()
+        or previous.get("src") != os.path.abspath(in_path)
+    ):
+        return False, file_sha256(in_path)
+    try:
+        src_stat, out_stat = os.stat(in_path), os.stat(out_path)
+    except OSError:
+        return False, file_sha256(in_path)
+    if (out_stat.st_size, out_stat.st_mtime_ns) != (previous.get("out_size"), previous.get("out_mtime_ns")):
+        return False, file_sha256(in_path)  # Output replaced, truncated or edited since
+    if (src_stat.st_size, src_stat.st_mtime_ns) == (previous.get("size"), previous.get("mtime_ns")):
+        sha256 = previous.get("sha256", "")
+    else:
+        sha256 = file_sha256(in_path)  # Touched or copied; the content may still be the same
+    if sha256 != previous.get("sha256"):
+        return False, sha256
+    return passwords_match(out_path, settings), sha256
+
+
+def protect_pdf(
+    in_path: str,
+    out_path: str,
+    settings: ProtectionSettings,
+    progress: Optional[Callable[[int], None]] = None,
+) -> None:
+    """
+    Write an encrypted copy of in_path to out_path.
+    progress(percent) is called by qpdf while saving; raising from it aborts
+    the save. pikepdf writes to a temporary file and only replaces out_path
+    when the save succeeds, so a failed or cancelled save leaves no partial file.
+    Raises pikepdf.PasswordError if the input already needs a password to open.
+    """
+    with pikepdf.open(in_path, **settings.save.open_kwargs()) as pdf:
+        pdf.save(
+            out_path,
+            encryption=settings.encryption(),
+            progress=progress,
+            **settings.save.save_kwargs(),
+        )
+
+
+def protect_file(
+    in_path: str,
+    settings: ProtectionSettings,
+    out_path: Optional[str] = None,
+    progress: Optional[Callable[[int], None]] = None,
+    track: bool = False,
+    previous: Optional[dict] = None,
+    verify: bool = False,
+) -> FileResult:
+    """
+    Protect one file and report the outcome instead of raising, so one bad
+    file never stops a batch. Runs in worker processes for batches.
+    With track=True the input is hashed for the manifest, and if previous
+    (its manifest entry) shows the output is still current, nothing is
+    written and the result is marked skipped. With verify=True the output
+    (written or kept) is checked by verify_output afterwards; a new output
+    that fails is deleted, a kept one is re-encrypted.
+    """
+    out_path = out_path or default_outname(in_path, settings.mode_open)
+    start = time.perf_counter()
+    try:
+        if os.path.abspath(in_path) == os.path.abspath(out_path):
+            raise ValueError("Output file must be different from the input file.")
+        sha256 = ""
+        if track:
+            current, sha256 = output_is_current(in_path, out_path, settings, previous)
+            if current and not (verify and verify_output(out_path, settings)):
+                return FileResult(in_path, out_path, True, seconds=time.perf_counter() - start,
+                                  skipped=True, sha256=sha256, verified=verify)
+        protect_pdf(in_path, out_path, settings, progress)
+        return _written_result(in_path, out_path, settings, start, verify, sha256)
+    except Exception as e:
+        return _failed_result(in_path, out_path, e, start)
+
+
+def _written_result(
+    in_path: str, out_path: str, settings: ProtectionSettings, start: float, verify: bool, sha256: str = ""
+) -> FileResult:
+    """
+    Result for a freshly written output, verifying it first if asked to.
+    An output that fails verification is deleted.
+    """
+    if not verify:
+        return FileResult(in_path, out_path, True, seconds=time.perf_counter() - start, sha256=sha256)
+    verify_start = time.perf_counter()
+    problem = verify_output(out_path, settings)
+    verify_seconds = time.perf_counter() - verify_start
+    if problem:
+        try:
+            os.remove(out_path)
+        except OSError:
+            pass
+        return FileResult(in_path, out_path, False, f"Verification failed: {problem}",
+                          time.perf_counter() - start, "VerificationError", verify_seconds=verify_seconds)
+    return FileResult(in_path, out_path, True, seconds=time.perf_counter() - start, sha256=sha256,
+                      verified=True, verify_seconds=verify_seconds)
+
+
+def _failed_result(in_path: str, out_path: str, e: Exception, start: float) -> FileResult:
+    """
+    Result for a file that could not be protected.
+    """
+    if isinstance(e, pikepdf.PasswordError):
+        error, error_type = "Already encrypted; requires a password to open.", "PasswordError"
+    elif isinstance(e, JobCancelled):
+        error, error_type = "Cancelled", "Cancelled"
+    else:
+        error, error_type = str(e) or type(e).__name__, type(e).__name__
+    return FileResult(in_path, out_path, False, error, time.perf_counter() - start, error_type)
+
+
+def collect_pdfs(paths: List[str], recursive: bool = False) -> List[str]:
+    """
+    Expand files and folders into a sorted list of input PDFs. Files named like
+    our own outputs (*_locked.pdf, *_nocopy.pdf) are skipped inside folders, so
+    re-running a batch does not lock its previous results again.
+    """
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            walker = os.walk(path) if recursive else [(path, [], os.listdir(path))]
+            for folder, _, names in walker:
+                for name in sorted(names):
+                    full = os.path.join(folder, name)
+                    if (name.lower().endswith(".pdf") and not name.lower().endswith(OUTPUT_SUFFIXES)
+                            and os.path.isfile(full)):
+                        found.append(full)
+        elif path:
+            found.append(path)
+    # Drop duplicates but keep the order
+    return list(dict.fromkeys(found))
+
+
+def resolve_worker_count(workers: Optional[int] = None) -> int:
+    """
+    Number of worker processes to use (default: one per CPU core).
+    """
+    if workers is None or workers <= 0:
+        workers = os.cpu_count() or 1
+    if os.name == "nt":
+        workers = min(workers, MAX_WORKERS_WINDOWS)
+    return max(1, workers)
+
+
+def run_isolated(
+    fn: Callable[..., FileResult],
+    jobs: List[Tuple[Any, tuple, dict]],
+    workers: int,
+    cancel_event: Optional[threading.Event] = None,
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: tuple = (),
+) -> Iterator[Tuple[Any, Optional[FileResult]]]:
+    """
+    Run fn(*args, **kwargs) for each (key, args, kwargs) job in a process of
+    its own, at most `workers` at a time, yielding (key, result) as they
+    finish; result is None if the process died. Used to retry the files of
+    a pool that broke, so one file that kills its worker (out of memory, a
+    qpdf crash) fails alone. Once cancel_event is set no more jobs start;
+    their keys are not yielded.
+    """
+    pending = deque(jobs)
+    running: Dict[Any, Tuple[Any, ProcessPoolExecutor]] = {}
+    while pending or running:
+        while pending and len(running) < workers and not (cancel_event is not None and cancel_event.is_set()):
+            key, args, kwargs = pending.popleft()
+            executor = ProcessPoolExecutor(max_workers=1, initializer=initializer, initargs=initargs)
+            running[executor.submit(fn, *args, **kwargs)] = (key, executor)
+        if not running:
+            return
+        finished, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in finished:
+            key, executor = running.pop(future)
+            executor.shutdown(wait=False)
+            try:
+                yield key, future.result()
+            except BrokenProcessPool:
+                yield key, None
+
+
+def protect_batch(
+    paths: List[str],
+    settings: ProtectionSettings,
+    workers: Optional[int] = None,
+    on_result: Optional[Callable[[FileResult], None]] = None,
+    cancel_event: Optional[threading.Event] = None,
+    skip_unchanged: bool = False,
+    verify: bool = False,
+) -> List[FileResult]:
+    """
+    Protect many PDFs in parallel on a process pool (pikepdf/qpdf work is
+    CPU-bound, so threads would not help). Outputs are named by default_outname.
+    on_result is called in this process as each file finishes; the returned
+    list is in input order. Once cancel_event is set, files not yet started
+    are reported as cancelled; files already being saved are finished.
+    With skip_unchanged, each output folder's Manifest is consulted and
+    updated, and inputs whose content and settings have not changed since
+    their output was made are skipped (hashing runs in the workers).
+    With verify, each worker checks its output right after saving it, so
+    verification overlaps with the other workers' encryption.
+    If a worker process dies, the files the pool had not finished are
+    retried one per process (run_isolated); only a file whose own process
+    dies again is reported as failed ("BrokenProcessPool").
+    """
+    workers = min(resolve_worker_count(workers), len(paths) or 1)
+    results = {}
+    manifests: Dict[str, Manifest] = {}
+    previous: Dict[str, Optional[dict]] = {}
+    if skip_unchanged:
+        for path in paths:
+            out_path = default_outname(path, settings.mode_open)
+            folder = os.path.dirname(os.path.abspath(out_path))
+            if folder not in manifests:
+                manifests[folder] = Manifest(folder)
+            previous[path] = manifests[folder].get(out_path)
+
+    def done(result: FileResult) -> None:
+        results[result.src] = result
+        if skip_unchanged and result.error_type != "Cancelled":
+            manifests[os.path.dirname(os.path.abspath(result.out))].record(result, settings)
+        if on_result is not None:
+            on_result(result)
+
+    def cancelled(path: str) -> FileResult:
+        return FileResult(path, default_outname(path, settings.mode_open), False, "Cancelled", error_type="Cancelled")
+
+    def crashed(path: str) -> FileResult:
+        return FileResult(path, default_outname(path, settings.mode_open), False,
+                          "The worker process died while protecting this file.", error_type="BrokenProcessPool")
+
+    def job(path: str) -> Tuple[str, tuple, dict]:
+        return path, (path, settings), dict(track=skip_unchanged, previous=previous.get(path), verify=verify)
+
+    if workers == 1:
+        for path in paths:
+            if cancel_event is not None and cancel_event.is_set():
+                done(cancelled(path))
+            else:
+                done(protect_file(path, settings, track=skip_unchanged, previous=previous.get(path), verify=verify))
+    else:
+        broken = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for path in paths:
+                _, args, kwargs = job(path)
+                futures[executor.submit(protect_file, *args, **kwargs)] = path
+            for future in as_completed(futures):
+                path = futures[future]
+                if future.cancelled():
+                    done(cancelled(path))
+                else:
+                    try:
+                        done(future.result())
+                    except BrokenProcessPool:
+                        broken.append(path)  # A worker died; the pool fails every file it had not finished
+                if cancel_event is not None and cancel_event.is_set():
+                    for pending in futures:
+                        pending.cancel()  # No-op for files already running or finished
+        for path, result in run_isolated(protect_file, [job(path) for path in broken], workers, cancel_event):
+            done(result or crashed(path))
+        for path in broken:
+            if path not in results:
+                done(cancelled(path))
+    for manifest in manifests.values():
+        try:
+            manifest.save()
+        except OSError:
+            pass  # Read-only output folder: the next run simply re-encrypts
+    return [results[path] for path in paths]
+
+
+@dataclass(frozen=True)
+class Recipient:
+    """
+    One per-recipient copy: where to write it and its open password.
+    """
+
+    out: str
+    password: str
+
+
+def read_recipients(csv_path: str, out_dir: str) -> List[Recipient]:
+    """
+    Read a recipients CSV with one "output,password" row per copy (a header
+    row with those names is optional; blank lines are ignored). Relative
+    output names are resolved against out_dir and get ".pdf" added if they
+    have no extension; spaces around names and passwords are ignored.
+    Raises ValueError naming the line of the first bad row: a missing name
+    or password, or an output listed twice.
+    """
+    recipients = []
+    seen = set()
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:  # utf-8-sig: Excel writes a BOM
+        for line_no, row in enumerate(csv.reader(f), start=1):
+            cells = [cell.strip() for cell in row]
+            if not any(cells):
+                continue
+            if line_no == 1 and tuple(c.lower() for c in cells[:2]) == RECIPIENTS_HEADER:
+                continue
+            if len(cells) < 2 or not cells[0] or not cells[1]:
+                raise ValueError(f"{csv_path}, line {line_no}: expected an output name and a password.")
+            name = cells[0] if os.path.splitext(cells[0])[1] else cells[0] + ".pdf"
+            out_path = os.path.join(out_dir, name)
+            key = os.path.normcase(os.path.abspath(out_path))
+            if key in seen:
+                raise ValueError(f"{csv_path}, line {line_no}: {name} is listed more than once.")
+            seen.add(key)
+            recipients.append(Recipient(out_path, cells[1]))
+    return recipients
+
+
+_copy_source: Optional[pikepdf.Pdf] = None  # Parsed source document, one per worker process
+_copy_source_error: Optional[Exception] = None
+
+
+def _open_copy_source(in_path: str, save: SaveOptions) -> None:
+    """
+    Parse the source document once for this process (the process pool
+    initializer of protect_copies). A failure is kept and reported by each
+    copy instead of killing the worker.
+    """
+    global _copy_source, _copy_source_error
+    try:
+        _copy_source = pikepdf.open(in_path, **save.open_kwargs())
+    except Exception as e:
+        _copy_source_error = e
+
+
+def _close_copy_source() -> None:
+    global _copy_source, _copy_source_error
+    if _copy_source is not None:
+        _copy_source.close()
+    _copy_source, _copy_source_error = None, None
+
+
+def _protect_copy(in_path: str, recipient: Recipient, settings: ProtectionSettings, verify: bool) -> FileResult:
+    """
+    Save one recipient's copy from the already parsed source.
+    """
+    start = time.perf_counter()
+    copy_settings = replace(settings, user=recipient.password)
+    try:
+        if os.path.abspath(in_path) == os.path.abspath(recipient.out):
+            raise ValueError("Output file must be different from the input file.")
+        if _copy_source_error is not None:
+            raise _copy_source_error
+        if settings.save.linearize and settings.save.object_streams == "generate":
+            # qpdf corrupts the page tree of every save after the first from one
+            # open document with this combination, so each copy re-parses
+            protect_pdf(in_path, recipient.out, copy_settings)
+        else:
+            _copy_source.save(recipient.out, encryption=copy_settings.encryption(), **settings.save.save_kwargs())
+        return _written_result(in_path, recipient.out, copy_settings, start, verify)
+    except Exception as e:
+        return _failed_result(in_path, recipient.out, e, start)
+
+
+def protect_copies(
+    in_path: str,
+    recipients: List[Recipient],
+    settings: ProtectionSettings,
+    workers: Optional[int] = None,
+    on_result: Optional[Callable[[FileResult], None]] = None,
+    cancel_event: Optional[threading.Event] = None,
+    verify: bool = False,
+) -> List[FileResult]:
+    """
+    Write one open-password copy of in_path per recipient, each encrypted
+    with that recipient's password (settings.user is ignored). The source
+    is parsed once per worker process rather than once per copy, and the
+    copies are saved from it in parallel; memory is therefore bounded by
+    the number of workers, not of recipients. Results, one per recipient,
+    come back as in protect_batch (on_result as each copy finishes, the
+    list in recipient order, cancel_event stops copies not yet started,
+    copies of a pool that broke are retried one per process).
+    """
+    if not settings.mode_open:
+        raise ValueError("Per-recipient copies need open-password mode.")
+    workers = min(resolve_worker_count(workers), len(recipients) or 1)
+    results: Dict[int, FileResult] = {}
+
+    def done(index: int, result: FileResult) -> None:
+        results[index] = result
+        if on_result is not None:
+            on_result(result)
+
+    def cancelled(recipient: Recipient) -> FileResult:
+        return FileResult(in_path, recipient.out, False, "Cancelled", error_type="Cancelled")
+
+    def crashed(recipient: Recipient) -> FileResult:
+        return FileResult(in_path, recipient.out, False, "The worker process died while writing this copy.",
+                          error_type="BrokenProcessPool")
+
+    if workers == 1:
+        _open_copy_source(in_path, settings.save)
+        try:
+            for index, recipient in enumerate(recipients):
+                if cancel_event is not None and cancel_event.is_set():
+                    done(index, cancelled(recipient))
+                else:
+                    done(index, _protect_copy(in_path, recipient, settings, verify))
+        finally:
+            _close_copy_source()
+    else:
+        broken = []
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_open_copy_source, initargs=(in_path, settings.save)
+        ) as executor:
+            futures = {
+                executor.submit(_protect_copy, in_path, recipient, settings, verify): index
+                for index, recipient in enumerate(recipients)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                if future.cancelled():
+                    done(index, cancelled(recipients[index]))
+                else:
+                    try:
+                        done(index, future.result())
+                    except BrokenProcessPool:
+                        broken.append(index)
+                if cancel_event is not None and cancel_event.is_set():
+                    for pending in futures:
+                        pending.cancel()  # No-op for copies already running or finished
+        jobs = [(index, (in_path, recipients[index], settings, verify), {}) for index in broken]
+        for index, result in run_isolated(_protect_copy, jobs, workers, cancel_event,
+                                          initializer=_open_copy_source, initargs=(in_path, settings.save)):
+            done(index, result or crashed(recipients[index]))
+        for index in broken:
+            if index not in results:
+                done(index, cancelled(recipients[index]))
+    return [results[index] for index in range(len(recipients))]
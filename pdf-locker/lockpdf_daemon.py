@@ -0,0 +1,475 @@
+"""
+lockpdf_daemon.py — Hot-folder daemon for lockpdf_core (no Qt).
+
+Watches a drop folder. Every PDF placed there is protected as soon as it
+has been completely written, using the same settings and password sources
+as lockpdf_cli.py:
+  - the protected copy goes to the output folder (*_locked.pdf / *_nocopy.pdf,
+    with " (2)", " (3)"... added if that name is taken)
+  - the original is moved to the archive folder, or deleted if none is set
+  - a file that cannot be protected is moved to the failed folder, with the
+    reason in <name>.error.txt next to it
+
+A file counts as completely written once its size and mtime have not changed
+for --settle seconds and it can be opened for writing (on Windows that fails
+while a copy is still in progress). Work runs on a fixed pool of -j worker
+processes, and at most that many files are handed to the pool at a time; a
+burst of drops waits in the daemon's own queue, so it never oversubscribes
+the machine.
+
+If a worker process dies (killed for running out of memory, or a crash in
+qpdf), the pool is rebuilt and the files it was working on are retried one
+at a time; a file that crashes a worker MAX_WORKER_CRASHES times goes to
+the failed folder instead of taking the daemon down.
+
+With --status-port, a local HTTP endpoint reports the queue depth and
+throughput: /status (JSON) and /metrics (Prometheus text format).
+
+Example:
+  set LOCKPDF_OWNER_PASSWORD=...
+  set LOCKPDF_USER_PASSWORD=...
+  python lockpdf_daemon.py D:\\ToLock --out D:\\Locked --failed D:\\LockFailed -j 4 --status-port 8765
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import argparse
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Collection, Deque, Dict, List, Optional, Set, Tuple
+
+from lockpdf_core import FileResult, ProtectionSettings, default_outname, protect_file, resolve_worker_count
+from lockpdf_cli import PASSWORD_HELP, add_protection_arguments, settings_from_args
+
+
+SETTLE_SECONDS = 5.0  # Size/mtime must stay unchanged this long before a file is picked up
+POLL_SECONDS = 1.0
+RATE_WINDOW_SECONDS = 300  # Window for the recent files/min figure
+ERROR_SUFFIX = ".error.txt"
+MAX_WORKER_CRASHES = 2  # A file that takes down a worker this often is moved to the failed folder
+
+EXIT_OK = 0
+EXIT_USAGE = 2
+
+
+class HotFolder:
+    """
+    Polls the drop folder (not its subfolders) and reports PDFs that have
+    finished being written. A path is reported again only after it has
+    disappeared, so a file that cannot be moved away is not re-processed
+    in a loop.
+    """
+
+    def __init__(self, folder: str, settle_seconds: float = SETTLE_SECONDS):
+        self.folder = folder
+        self.settle_seconds = settle_seconds
+        self.pending: Dict[str, Tuple[Tuple[int, int], float]] = {}  # path -> ((size, mtime_ns), unchanged since)
+        self.taken: Dict[str, Tuple[int, int]] = {}  # path -> (size, mtime_ns) when it was handed out
+
+    def poll(self) -> List[str]:
+        now = time.monotonic()
+        ready = []
+        seen = set()
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith(".pdf") or entry.name.startswith((".", "~$")):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue  # Vanished while listing
+                path = entry.path
+                seen.add(path)
+                signature = (st.st_size, st.st_mtime_ns)
+                if self.taken.get(path) == signature:
+                    continue
+                previous = self.pending.get(path)
+                if previous is None or previous[0] != signature:
+                    self.pending[path] = (signature, now)  # New or still growing; restart the settle timer
+                    continue
+                if now - previous[1] < self.settle_seconds or st.st_size == 0 or not self._writable(path):
+                    continue
+                del self.pending[path]
+                self.taken[path] = signature
+                ready.append(path)
+        for gone in set(self.pending) - seen:
+            del self.pending[gone]
+        for gone in set(self.taken) - seen:
+            del self.taken[gone]
+        return sorted(ready)
+
+    @staticmethod
+    def _writable(path: str) -> bool:
+        """
+        False while another process still holds the file (Windows denies
+        write access during a copy; elsewhere the settle time does the job).
+        """
+        try:
+            with open(path, "r+b"):
+                return True
+        except OSError:
+            return False
+
+
+class DaemonStats:
+    """
+    Counters shared between the daemon loop and the status endpoint.
+    """
+
+    def __init__(self, workers: int):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.workers = workers
+        self.settling = 0
+        self.queued = 0
+        self.in_flight = 0
+        self.done = 0
+        self.failed = 0
+        self.bytes_done = 0
+        self.busy_seconds = 0.0
+        self.last_error = ""
+        self.recent: Deque[float] = deque()  # Completion times within RATE_WINDOW_SECONDS
+
+    def finished(self, result: FileResult, size: int) -> None:
+        with self.lock:
+            now = time.time()
+            self.recent.append(now)
+            while self.recent and self.recent[0] < now - RATE_WINDOW_SECONDS:
+                self.recent.popleft()
+            self.busy_seconds += result.seconds
+            if result.ok:
+                self.done += 1
+                self.bytes_done += size
+            else:
+                self.failed += 1
+                self.last_error = f"{os.path.basename(result.src)}: {result.error}"
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            uptime = time.time() - self.started
+            window = min(uptime, RATE_WINDOW_SECONDS) or 1.0
+            recent = sum(t >= time.time() - RATE_WINDOW_SECONDS for t in self.recent)
+            processed = self.done + self.failed
+            return dict(
+                uptime_s=round(uptime, 1),
+                workers=self.workers,
+                settling=self.settling,
+                queued=self.queued,
+                in_flight=self.in_flight,
+                queue_depth=self.settling + self.queued + self.in_flight,
+                done=self.done,
+                failed=self.failed,
+                files_per_min_recent=round(recent * 60 / window, 2),
+                files_per_min_total=round(processed * 60 / (uptime or 1.0), 2),
+                mb_done=round(self.bytes_done / 1e6, 2),
+                mb_per_s=round(self.bytes_done / 1e6 / uptime, 3) if uptime else 0.0,
+                avg_seconds_per_file=round(self.busy_seconds / processed, 3) if processed else None,
+                last_error=self.last_error,
+            )
+
+
+def start_status_server(stats: DaemonStats, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serve /status (JSON) and /metrics (Prometheus text) on a daemon thread.
+    Binds to localhost by default; the figures are not secret, but there is
+    no reason to expose them further.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            snapshot = stats.snapshot()
+            if self.path.rstrip("/") in ("", "/status"):
+                body, content_type = json.dumps(snapshot, indent=2).encode("utf-8"), "application/json"
+            elif self.path == "/metrics":
+                lines = [
+                    f"lockpdf_{key} {value}"
+                    for key, value in snapshot.items()
+                    if isinstance(value, (int, float)) and not isinstance(value, bool)
+                ]
+                body, content_type = ("\n".join(lines) + "\n").encode("utf-8"), "text/plain; version=0.0.4"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            pass  # Keep the daemon's console for file events
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="lockpdf-status", daemon=True).start()
+    return server
+
+
+def free_name(folder: str, name: str, reserved: Collection[str] = ()) -> str:
+    """
+    Path for name in folder, with " (2)", " (3)"... added if a file of that
+    name exists or the path is in reserved.
+    """
+    root, ext = os.path.splitext(name)
+    target = os.path.join(folder, name)
+    n = 2
+    while os.path.exists(target) or target in reserved:
+        target = os.path.join(folder, f"{root} ({n}){ext}")
+        n += 1
+    return target
+
+
+def move_aside(path: str, folder: str) -> str:
+    """
+    Move path into folder, adding " (2)", " (3)"... if the name is taken.
+    Returns the new path.
+    """
+    target = free_name(folder, os.path.basename(path))
+    shutil.move(path, target)
+    return target
+
+
+class HotFolderDaemon:
+    """
+    Ties the HotFolder, a bounded process pool and the output, archive and
+    failed folders together.
+    """
+
+    def __init__(
+        self,
+        in_dir: str,
+        out_dir: str,
+        failed_dir: str,
+        settings: ProtectionSettings,
+        archive_dir: Optional[str] = None,
+        workers: Optional[int] = None,
+        verify: bool = False,
+        settle_seconds: float = SETTLE_SECONDS,
+        poll_seconds: float = POLL_SECONDS,
+    ):
+        self.in_dir = in_dir
+        self.out_dir = out_dir
+        self.failed_dir = failed_dir
+        self.archive_dir = archive_dir
+        self.settings = settings
+        self.verify = verify
+        self.workers = resolve_worker_count(workers)
+        self.poll_seconds = poll_seconds
+        self.folder = HotFolder(in_dir, settle_seconds)
+        self.stats = DaemonStats(self.workers)
+        self.queue: Deque[str] = deque()
+        self.crashes: Dict[str, int] = {}  # path -> worker crashes while protecting it
+        self.reserved: Set[str] = set()  # Output paths of files in flight
+        self.stop_event = threading.Event()
+
+    def output_path(self, in_path: str) -> str:
+        """
+        Reserve a free output name. Drops from different users can share a
+        name, so an existing output, or one still being written, is never
+        replaced; the new one gets " (2)", " (3)"... instead.
+        """
+        name = os.path.basename(default_outname(in_path, self.settings.mode_open))
+        out_path = free_name(self.out_dir, name, self.reserved)
+        self.reserved.add(out_path)
+        return out_path
+
+    def run(self) -> None:
+        """
+        Process drops until stop_event is set or Ctrl+C. Files already
+        being protected are finished before returning.
+        """
+        in_flight: Dict[Future, Tuple[str, int, str]] = {}
+        executor = self._new_executor()
+        try:
+            try:
+                while not self.stop_event.is_set():
+                    self.queue.extend(p for p in self.folder.poll() if p not in self.queue)
+                    broken = False
+                    while self.queue and len(in_flight) < self.workers and not self._must_wait(in_flight):
+                        path = self.queue.popleft()
+                        try:
+                            size = os.path.getsize(path)
+                        except OSError:
+                            continue  # Removed again before we got to it
+                        out_path = self.output_path(path)
+                        try:
+                            future = executor.submit(protect_file, path, self.settings, out_path, verify=self.verify)
+                        except BrokenProcessPool:
+                            self.reserved.discard(out_path)
+                            self.queue.appendleft(path)  # Not this file's fault; resubmitted to the new pool
+                            broken = True
+                            break
+                        in_flight[future] = (path, size, out_path)
+                    self._update_gauges(len(in_flight))
+                    if in_flight:
+                        finished, _ = wait(in_flight, timeout=self.poll_seconds, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            broken = self._handle(future, *in_flight.pop(future)) or broken
+                    elif not broken:
+                        self.stop_event.wait(self.poll_seconds)
+                    if broken:
+                        # Every file still in flight failed with the pool; requeue them and start over
+                        for future in wait(in_flight).done:
+                            self._handle(future, *in_flight[future])
+                        in_flight.clear()
+                        executor.shutdown(wait=False)
+                        executor = self._new_executor()
+            except KeyboardInterrupt:
+                print("\nStopping: finishing files in progress...")
+            for future in wait(in_flight).done:
+                self._handle(future, *in_flight[future])
+        finally:
+            executor.shutdown(wait=True)
+        self._update_gauges(0)
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # Workers ignore Ctrl+C so the files they are on are finished, not failed
+        return ProcessPoolExecutor(
+            max_workers=self.workers, initializer=signal.signal, initargs=(signal.SIGINT, signal.SIG_IGN)
+        )
+
+    def _must_wait(self, in_flight: Dict[Future, Tuple[str, int, str]]) -> bool:
+        """
+        A file that was in flight when a worker died runs on its own, so a
+        second crash is pinned on the right file and costs no other file a
+        retry.
+        """
+        if not in_flight:
+            return False
+        return bool(self.crashes.get(self.queue[0])) or any(self.crashes.get(p) for p, _, _ in in_flight.values())
+
+    def _update_gauges(self, in_flight: int) -> None:
+        with self.stats.lock:
+            self.stats.settling = len(self.folder.pending)
+            self.stats.queued = len(self.queue)
+            self.stats.in_flight = in_flight
+
+    def _handle(self, future: Future, path: str, size: int, out_path: str) -> bool:
+        """
+        Record the outcome of one file. Returns True if the worker pool broke.
+        """
+        self.reserved.discard(out_path)
+        try:
+            result = future.result()
+        except BrokenProcessPool:
+            crashes = self.crashes.get(path, 0) + 1
+            if crashes < MAX_WORKER_CRASHES:
+                self.crashes[path] = crashes
+                self.queue.appendleft(path)
+                print(f"WARN  {os.path.basename(path)}: worker process died; retrying on its own", file=sys.stderr)
+                return True
+            result = FileResult(path, "", False, f"The worker process died {crashes} times while protecting this file.",
+                                error_type="BrokenProcessPool")
+            self._finish(path, size, result)
+            return True
+        except Exception as e:
+            # The pool could not run the job at all, not a problem with the file
+            self.folder.taken.pop(path, None)  # Offer it again on the next scan
+            print(f"WARN  {os.path.basename(path)}: left in the drop folder ({e or type(e).__name__})", file=sys.stderr)
+            return False
+        self._finish(path, size, result)
+        return False
+
+    def _finish(self, path: str, size: int, result: FileResult) -> None:
+        """
+        Move the original out of the drop folder and record the outcome.
+        """
+        self.crashes.pop(path, None)
+        try:
+            if result.ok:
+                if self.archive_dir:
+                    move_aside(path, self.archive_dir)
+                else:
+                    os.remove(path)
+                checked = f", verified in {result.verify_seconds:.2f}s" if result.verified else ""
+                print(f"OK    {os.path.basename(path)} -> {result.out} ({result.seconds:.2f}s{checked})")
+            else:
+                moved = move_aside(path, self.failed_dir)
+                with open(moved + ERROR_SUFFIX, "w", encoding="utf-8") as f:
+                    f.write(f"{result.error_type}: {result.error}\n")
+                print(f"FAIL  {os.path.basename(path)}: {result.error}", file=sys.stderr)
+        except OSError as e:
+            # Left in the drop folder; HotFolder will not hand it out again unless it changes
+            print(f"WARN  {os.path.basename(path)}: could not move the original ({e})", file=sys.stderr)
+        self.stats.finished(result, size)
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """
+    Create the argument parser.
+    """
+    parser = argparse.ArgumentParser(
+        description="Watch a drop folder and protect every PDF placed in it.",
+        epilog=PASSWORD_HELP,
+    )
+    parser.add_argument("in_dir", help="Drop folder to watch")
+    parser.add_argument("--out", required=True, help="Folder for the protected copies")
+    parser.add_argument("--failed", required=True, help="Folder for inputs that could not be protected")
+    parser.add_argument("--archive", help="Folder for the originals after success (default: delete them)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: one per CPU core)")
+    parser.add_argument("--settle", type=float, default=SETTLE_SECONDS, metavar="SECONDS",
+                        help=f"Seconds a file must stay unchanged before it is picked up (default: {SETTLE_SECONDS:g})")
+    parser.add_argument("--poll-interval", type=float, default=POLL_SECONDS, metavar="SECONDS",
+                        help=f"Seconds between folder scans (default: {POLL_SECONDS:g})")
+    parser.add_argument("--status-port", type=int, default=None, metavar="PORT",
+                        help="Serve /status (JSON) and /metrics on 127.0.0.1:PORT")
+    add_protection_arguments(parser)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point. Runs until Ctrl+C; returns a process exit code.
+    """
+    args = build_arg_parser().parse_args(argv)
+    if not os.path.isdir(args.in_dir):
+        print(f"Error: Not a folder: {args.in_dir}", file=sys.stderr)
+        return EXIT_USAGE
+    folders = [os.path.abspath(p) for p in (args.in_dir, args.out, args.failed, args.archive) if p]
+    if len(set(folders)) != len(folders):
+        print("Error: The drop, output, failed and archive folders must all be different.", file=sys.stderr)
+        return EXIT_USAGE
+    for folder in folders[1:]:
+        os.makedirs(folder, exist_ok=True)
+
+    settings = settings_from_args(args)
+    if settings is None:
+        return EXIT_USAGE
+
+    daemon = HotFolderDaemon(
+        args.in_dir,
+        args.out,
+        args.failed,
+        settings,
+        archive_dir=args.archive,
+        workers=args.workers,
+        verify=args.verify,
+        settle_seconds=args.settle,
+        poll_seconds=args.poll_interval,
+    )
+    status = start_status_server(daemon.stats, args.status_port) if args.status_port else None
+    print(
+        f"Watching {args.in_dir} with {daemon.workers} worker(s), settle {args.settle:g}s"
+        + (f", status on http://127.0.0.1:{args.status_port}/status" if status else "")
+        + ". Press Ctrl+C to stop."
+    )
+    try:
+        daemon.run()
+    finally:
+        if status is not None:
+            status.shutdown()
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Needed for worker processes in frozen (PyInstaller) builds
+    sys.exit(main())
@@ -5,7 +5,8 @@ lockpdf_gui_qt.py — Simple GUI to protect PDFs with either:
 
 Built with:
   - PySide6 (Qt) for the GUI
-  - pikepdf (a Python wrapper of qpdf) for PDF encryption
+  - pikepdf (a Python wrapper of qpdf) for PDF encryption, through
+    lockpdf_core.py (shared with the command-line tool lockpdf_cli.py)
 
 Notes:
   - The "no-copy/print" option is NOT true security; it relies on PDF
@@ -15,12 +16,21 @@ Notes:
 
 Update:
   - Eye buttons next to both password fields. Click to show/hide.
+  - Batch mode: choose several PDFs or a folder; files are protected in
+    parallel on a process pool and each file gets its own result.
+  - Work runs on a QThreadPool worker with a progress bar and Cancel, so the
+    window stays responsive while large PDFs are encrypted.
+  - Single instance: later launches (e.g. drag & drop onto the .bat) hand
+    their paths to the open window through lockpdf_instance.py. Paths that
+    arrive while a job runs are queued and protected next.
 """
 
 import os
 import sys
+import threading
 import subprocess
-from typing import Optional
+import multiprocessing
+from typing import List, Optional
 
 from PySide6.QtWidgets import (
     QApplication,
@@ -35,25 +45,32 @@ from PySide6.QtWidgets import (
     QButtonGroup,
     QCheckBox,
     QMessageBox,
+    QProgressBar,
 )
-from PySide6.QtCore import Qt
-
-import pikepdf
-from pikepdf import Encryption, Permissions
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Qt, Signal
+
+from lockpdf_core import (
+    MANIFEST_NAME,
+    FileResult,
+    JobCancelled,
+    ProtectionSettings,
+    SaveOptions,
+    collect_pdfs,
+    default_outname,
+    protect_batch,
+    protect_file,
+)
+from lockpdf_instance import NEW_INSTANCE_FLAG, InstanceServer, forward_paths
 
 
 APP_TITLE = "PDF Lock (Qt) — Open Password or No-Copy/Print"
 
 
-def default_outname(src: str, mode_open: bool) -> str:
+def parse_input_paths(text: str) -> List[str]:
     """
-    Suggest an output filename next to the input:
-      - *_locked.pdf for open-password mode
-      - *_nocopy.pdf for no-copy/print mode
+    Split the input field into paths (several files are separated by ";").
     """
-    root, _ = os.path.splitext(src)
-    suffix = "_locked" if mode_open else "_nocopy"
-    return f"{root}{suffix}.pdf"
+    return [part.strip().strip('"') for part in text.split(";") if part.strip()]
 
 
 def reveal_in_explorer(path: str) -> None:
@@ -73,6 +90,83 @@ def reveal_in_explorer(path: str) -> None:
         pass
 
 
+class JobSignals(QObject):
+    """
+    Signals for ProtectJob (a QRunnable cannot emit signals itself).
+    """
+
+    progress = Signal(int, str)  # percent, status text
+    finished = Signal(list)  # List[FileResult], in input order
+
+
+class ProtectJob(QRunnable):
+    """
+    Runs a single-file or batch protection on a QThreadPool thread so the
+    window stays responsive. Progress and results arrive through signals,
+    which Qt delivers on the GUI thread.
+    """
+
+    def __init__(
+        self,
+        files: List[str],
+        settings: ProtectionSettings,
+        out_path: Optional[str] = None,
+        batch: bool = False,
+        skip_unchanged: bool = False,
+        verify: bool = False,
+    ):
+        super().__init__()
+        self.setAutoDelete(False)  # Main keeps the reference until finished
+        self.files = files
+        self.settings = settings
+        self.out_path = out_path
+        self.batch = batch
+        self.skip_unchanged = skip_unchanged
+        self.verify = verify
+        self.signals = JobSignals()
+        self.cancel_event = threading.Event()
+        self.completed = 0
+
+    def cancel(self) -> None:
+        """
+        Ask the job to stop: a single save is aborted at its next progress
+        callback; a batch stops starting new files.
+        """
+        self.cancel_event.set()
+
+    def run(self) -> None:
+        try:
+            if self.batch:
+                results = protect_batch(
+                    self.files,
+                    self.settings,
+                    on_result=self._file_done,
+                    cancel_event=self.cancel_event,
+                    skip_unchanged=self.skip_unchanged,
+                    verify=self.verify,
+                )
+            else:
+                results = [
+                    protect_file(self.files[0], self.settings, self.out_path, self._save_progress, verify=self.verify)
+                ]
+        except Exception as e:
+            # e.g. a worker process died; report every file rather than losing the job
+            results = [FileResult(f, "", False, str(e) or type(e).__name__, error_type=type(e).__name__) for f in self.files]
+        self.signals.finished.emit(results)
+
+    def _save_progress(self, percent: int) -> None:
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+        self.signals.progress.emit(percent, f"Encrypting {os.path.basename(self.files[0])}… {percent}%")
+
+    def _file_done(self, result: FileResult) -> None:
+        self.completed += 1
+        self.signals.progress.emit(
+            int(self.completed * 100 / len(self.files)),
+            f"{self.completed} of {len(self.files)} files — {os.path.basename(result.src)}",
+        )
+
+
 class Main(QWidget):
     """
     Main application window.
@@ -85,6 +179,7 @@ class Main(QWidget):
         # Widgets (defined in _build_ui)
         self.in_edit: QLineEdit
         self.in_browse: QPushButton
+        self.in_folder: QPushButton
         self.out_edit: QLineEdit
         self.out_browse: QPushButton
         self.radio_open: QRadioButton
@@ -96,13 +191,23 @@ class Main(QWidget):
         self.owner_pw_eye_btn: QPushButton
         self.chk_copy: QCheckBox
         self.chk_print: QCheckBox
+        self.chk_compact: QCheckBox
+        self.chk_linearize: QCheckBox
+        self.chk_skip_unchanged: QCheckBox
+        self.chk_verify: QCheckBox
         self.apply_btn: QPushButton
+        self.progress_bar: QProgressBar
+        self.cancel_btn: QPushButton
+        self.queue_label: QLabel
 
+        self._job: Optional[ProtectJob] = None
+        self._queue: List[str] = []  # Forwarded paths waiting for the running job
+        self._done_input: Optional[str] = None  # Input field text of the last finished job
         self._build_ui()
         self._wire_events()
 
-        # Prefill input path if provided (e.g., passed by a .bat as %1)
-        if initial_pdf and os.path.isfile(initial_pdf):
+        # Prefill input path(s) if provided (e.g., passed by a .bat as %*)
+        if initial_pdf and all(os.path.exists(p) for p in parse_input_paths(initial_pdf)):
             self.in_edit.setText(initial_pdf)
 
         # Sync dependent UI
@@ -113,11 +218,14 @@ class Main(QWidget):
 
         # Row: input PDF
         row1 = QHBoxLayout()
-        row1.addWidget(QLabel("PDF file:"))
+        row1.addWidget(QLabel("PDF file(s):"))
         self.in_edit = QLineEdit()
+        self.in_edit.setPlaceholderText("One PDF, several separated by ';', or a folder")
         self.in_browse = QPushButton("Browse…")
+        self.in_folder = QPushButton("Folder…")
         row1.addWidget(self.in_edit, 1)
         row1.addWidget(self.in_browse)
+        row1.addWidget(self.in_folder)
         root.addLayout(row1)
 
         # Protection type
@@ -173,6 +281,26 @@ class Main(QWidget):
         opts_row.addStretch(1)
         root.addLayout(opts_row)
 
+        # Save options
+        save_row = QHBoxLayout()
+        save_row.addWidget(QLabel("Output:"))
+        self.chk_compact = QCheckBox("Compact (object streams)")
+        self.chk_compact.setToolTip("Pack objects into compressed object streams for a smaller file")
+        self.chk_linearize = QCheckBox("Fast web view")
+        self.chk_linearize.setToolTip("Linearize so the first page shows before the download ends (slower save)")
+        save_row.addWidget(self.chk_compact)
+        self.chk_skip_unchanged = QCheckBox("Skip unchanged")
+        self.chk_skip_unchanged.setToolTip(
+            f"Batches: keep outputs whose input has not changed since they were made ({MANIFEST_NAME})"
+        )
+        save_row.addWidget(self.chk_linearize)
+        self.chk_verify = QCheckBox("Verify output")
+        self.chk_verify.setToolTip("Re-open each saved file and check its encryption and permissions")
+        save_row.addWidget(self.chk_skip_unchanged)
+        save_row.addWidget(self.chk_verify)
+        save_row.addStretch(1)
+        root.addLayout(save_row)
+
         # Row: output file
         row_out = QHBoxLayout()
         row_out.addWidget(QLabel("Output file:"))
@@ -186,6 +314,21 @@ class Main(QWidget):
         self.apply_btn = QPushButton("Apply Protection")
         root.addWidget(self.apply_btn)
 
+        # Progress (visible only while a job runs)
+        row_progress = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setTextVisible(True)
+        self.cancel_btn = QPushButton("Cancel")
+        self.queue_label = QLabel()
+        row_progress.addWidget(self.progress_bar, 1)
+        row_progress.addWidget(self.queue_label)
+        row_progress.addWidget(self.cancel_btn)
+        root.addLayout(row_progress)
+        self.progress_bar.setVisible(False)
+        self.cancel_btn.setVisible(False)
+        self.queue_label.setVisible(False)
+
         # Note
         note = QLabel(
             "Note: 'No-copy/print' relies on PDF viewers to honor permissions. "
@@ -197,8 +340,10 @@ class Main(QWidget):
 
     def _wire_events(self) -> None:
         self.in_browse.clicked.connect(self.browse_in)
+        self.in_folder.clicked.connect(self.browse_folder)
         self.out_browse.clicked.connect(self.browse_out)
         self.apply_btn.clicked.connect(self.apply)
+        self.cancel_btn.clicked.connect(self.cancel_job)
         self.radio_open.toggled.connect(self.on_mode_change)
         self.in_edit.textChanged.connect(self.update_out_suggestion)
 
@@ -230,21 +375,46 @@ class Main(QWidget):
         self.chk_print.setVisible(not is_open)
         self.update_out_suggestion()
 
+    def is_batch(self) -> bool:
+        """
+        True when the input is several files or a folder.
+        """
+        paths = parse_input_paths(self.in_edit.text())
+        return len(paths) > 1 or (len(paths) == 1 and os.path.isdir(paths[0]))
+
     def update_out_suggestion(self) -> None:
         """
         Suggest an output filename once an input is chosen or mode changes.
+        In batch mode each output is named next to its input instead.
         """
+        batch = self.is_batch()
+        self.out_edit.setEnabled(not batch)
+        self.out_browse.setEnabled(not batch)
+        if batch:
+            suffix = "_locked.pdf" if self.radio_open.isChecked() else "_nocopy.pdf"
+            self.out_edit.clear()
+            self.out_edit.setPlaceholderText(f"Batch: each file is saved next to its input as *{suffix}")
+            return
+        self.out_edit.setPlaceholderText("")
         src = self.in_edit.text().strip()
         if src:
             self.out_edit.setText(default_outname(src, self.radio_open.isChecked()))
 
     def browse_in(self) -> None:
         """
-        Choose input PDF.
+        Choose one or more input PDFs.
         """
-        path, _ = QFileDialog.getOpenFileName(
-            self, "Choose a PDF", "", "PDF files (*.pdf)"
+        paths, _ = QFileDialog.getOpenFileNames(
+            self, "Choose PDF(s)", "", "PDF files (*.pdf)"
         )
+        if paths:
+            self.in_edit.setText("; ".join(paths))
+
+    def browse_folder(self) -> None:
+        """
+        Choose a folder; every PDF in it is protected (batch mode).
+        """
+        path = QFileDialog.getExistingDirectory(self, "Choose a folder of PDFs")
         if path:
             self.in_edit.setText(path)
 
@@ -263,10 +433,14 @@ class Main(QWidget):
 
     def apply(self) -> None:
         """
-        Perform the encryption or permission restriction using pikepdf.
-        This version avoids passing allow=None (which can cause a NoneType error)
-        and uses only Permissions arguments supported by pikepdf 9.10.2.
+        Perform the encryption or permission restriction using pikepdf
+        (see ProtectionSettings.encryption). Several files or a folder are
+        handled as a batch.
         """
+        if self.is_batch():
+            self.apply_batch()
+            return
+
         in_path = self.in_edit.text().strip()
         out_path = self.out_edit.text().strip()
 
@@ -274,16 +448,61 @@ class Main(QWidget):
             QMessageBox.critical(self, "Error", "Please choose a valid PDF file.")
             return
 
+        settings = self.read_settings()
+        if settings is None:
+            return
+
+        if not out_path:
+            out_path = default_outname(in_path, settings.mode_open)
+
+        # Safety: output must differ from input
+        if os.path.abspath(in_path) == os.path.abspath(out_path):
+            QMessageBox.critical(
+                self, "Error", "Output file must be different from the input file."
+            )
+            return
+
+        self.start_job(ProtectJob([in_path], settings, out_path, verify=self.chk_verify.isChecked()))
+
+    def show_single_result(self, result: FileResult) -> None:
+        """
+        Success dialog (and optional reveal) or error for a single-file job.
+        """
+        if result.ok:
+            checked = "\n\nVerified: encryption and permissions are as requested." if result.verified else ""
+            QMessageBox.information(self, "Success", f"Protected PDF written:\n{result.out}{checked}")
+            if (
+                QMessageBox.question(
+                    self,
+                    "Open Folder?",
+                    "Open the output folder?",
+                    QMessageBox.Yes | QMessageBox.No,
+                )
+                == QMessageBox.Yes
+            ):
+                reveal_in_explorer(result.out)
+        elif result.error_type == "Cancelled":
+            QMessageBox.information(self, "Cancelled", "Protection cancelled; no file was written.")
+        elif result.error_type == "PasswordError":
+            QMessageBox.critical(
+                self,
+                "Error",
+                "This PDF is already encrypted and requires a password to open.",
+            )
+        else:
+            QMessageBox.critical(self, "Error", f"Failed to save protected PDF:\n{result.error}")
+
+    def read_settings(self) -> Optional[ProtectionSettings]:
+        """
+        Validate the password fields and build the settings, or show an error
+        and return None.
+        """
         owner = self.owner_pw_edit.text()
         if not owner:
             QMessageBox.critical(
                 self, "Error", "Owner password is required (controls permissions)."
             )
-            return
-
-        # Build kwargs for Encryption(...) carefully.
-        # We never pass allow=None; we only add "allow" when we actually build Permissions.
-        encryption_kwargs = dict(owner=owner, R=6)  # R=6 -> AES-256
+            return None
 
         if self.radio_open.isChecked():
             # Require a password to open the PDF
@@ -294,74 +513,210 @@ class Main(QWidget):
                     "Error",
                     "Enter an Open password (or choose the No-copy/print mode).",
                 )
-                return
-            encryption_kwargs["user"] = user
-            # Do NOT set "allow" at all (no permissions object in open-password mode)
+                return None
         else:
             # No-copy/print mode: open without a password, set viewer-enforced permissions
             user = ""
-            encryption_kwargs["user"] = user
-
-            # pikepdf 9.10.2 Permissions uses "modify_annotation" (not "modify_annotate");
-            # do not include "assemble" in this version.
-            perms = Permissions(
-                accessibility=True,
-                extract=not self.chk_copy.isChecked(),        # block copy -> extract=False
-                print_lowres=not self.chk_print.isChecked(),  # block print -> False
-                print_highres=not self.chk_print.isChecked(),
-                modify_annotation=False,
-                modify_form=False,
-                modify_other=False,
-            )
-            encryption_kwargs["allow"] = perms
 
-        if not out_path:
-            out_path = default_outname(in_path, self.radio_open.isChecked())
+        return ProtectionSettings(
+            owner=owner,
+            user=user,
+            mode_open=self.radio_open.isChecked(),
+            block_copy=self.chk_copy.isChecked(),
+            block_print=self.chk_print.isChecked(),
+            save=SaveOptions(
+                object_streams="generate" if self.chk_compact.isChecked() else "preserve",
+                linearize=self.chk_linearize.isChecked(),
+            ),
+        )
 
-        # Safety: output must differ from input
-        if os.path.abspath(in_path) == os.path.abspath(out_path):
-            QMessageBox.critical(
-                self, "Error", "Output file must be different from the input file."
+    def apply_batch(self) -> None:
+        """
+        Protect every selected PDF (or every PDF in the chosen folder) on a
+        process pool, then summarise successes and failures.
+        """
+        paths = parse_input_paths(self.in_edit.text())
+        missing = [p for p in paths if not os.path.exists(p)]
+        if missing:
+            QMessageBox.critical(self, "Error", "Not found:\n" + "\n".join(missing))
+            return
+        files = collect_pdfs(paths)
+        if not files:
+            QMessageBox.critical(self, "Error", "No PDF files found in the selection.")
+            return
+
+        settings = self.read_settings()
+        if settings is None:
+            return
+
+        self.start_job(
+            ProtectJob(
+                files,
+                settings,
+                batch=True,
+                skip_unchanged=self.chk_skip_unchanged.isChecked(),
+                verify=self.chk_verify.isChecked(),
             )
+        )
+
+    # ---------- Background job ----------
+
+    def start_job(self, job: ProtectJob) -> None:
+        """
+        Run a job on the global QThreadPool and switch the window to busy mode.
+        """
+        self._job = job
+        job.signals.progress.connect(self.on_job_progress)
+        job.signals.finished.connect(self.on_job_finished)
+        self.set_busy(True)
+        QThreadPool.globalInstance().start(job)
+
+    def set_busy(self, busy: bool) -> None:
+        """
+        Lock the inputs and show the progress row while a job runs.
+        """
+        for widget in (self.in_edit, self.in_browse, self.in_folder, self.radio_open, self.radio_restrict,
+                       self.owner_pw_edit, self.chk_copy, self.chk_print, self.chk_compact, self.chk_linearize,
+                       self.chk_skip_unchanged, self.chk_verify, self.apply_btn):
+            widget.setEnabled(not busy)
+        self.progress_bar.setVisible(busy)
+        self.cancel_btn.setVisible(busy)
+        self.cancel_btn.setEnabled(busy)
+        self.cancel_btn.setText("Cancel")
+        if busy:
+            self.progress_bar.setValue(0)
+            self.progress_bar.setFormat("Starting…")
+        # Mode-dependent states, without touching the output path the user chose
+        self.open_pw_edit.setEnabled(not busy and self.radio_open.isChecked())
+        self.open_pw_eye_btn.setEnabled(not busy and self.radio_open.isChecked())
+        self.out_edit.setEnabled(not busy and not self.is_batch())
+        self.out_browse.setEnabled(not busy and not self.is_batch())
+
+    def on_job_progress(self, percent: int, text: str) -> None:
+        self.progress_bar.setValue(percent)
+        self.progress_bar.setFormat(text)
+
+    def on_job_finished(self, results: List[FileResult]) -> None:
+        job, self._job = self._job, None
+        self.set_busy(False)
+        self._done_input = self.in_edit.text()
+        if job is not None and self._queue:
+            # Start the queued files before showing this job's results, so the
+            # queue keeps moving while the result dialogs are open
+            files, self._queue = collect_pdfs(self._queue), []
+            self.update_queue_label()
+            if files:
+                self.start_job(ProtectJob(files, job.settings, batch=True, skip_unchanged=job.skip_unchanged, verify=job.verify))
+        if job is not None and job.batch:
+            self.show_batch_results(results)
+        elif results:
+            self.show_single_result(results[0])
+
+    def cancel_job(self) -> None:
+        """
+        Request cancellation; the job reports back through on_job_finished.
+        """
+        if self._job is not None:
+            self._job.cancel()
+            self._queue = []
+            self.update_queue_label()
+            self.cancel_btn.setEnabled(False)
+            self.cancel_btn.setText("Cancelling…")
+
+    # ---------- Forwarded paths (single instance) ----------
+
+    def enqueue_paths(self, paths: List[str]) -> None:
+        """
+        Paths sent by a later launch. While a job runs they are queued and
+        protected with the same settings as soon as it finishes; otherwise
+        they go into the input field, ready for Apply.
+        """
+        self.showNormal()
+        self.raise_()
+        self.activateWindow()
+        paths = [p for p in paths if os.path.exists(p)]
+        if not paths:
+            return
+        if self._job is not None:
+            self._queue.extend(p for p in paths if p not in self._queue)
+            self.update_queue_label()
             return
+        current = parse_input_paths(self.in_edit.text())
+        if self.in_edit.text() == self._done_input:
+            current = []  # Already protected; start a new selection
+        self.in_edit.setText("; ".join(current + [p for p in paths if p not in current]))
 
-        try:
-            with pikepdf.open(in_path) as pdf:
-                pdf.save(out_path, encryption=Encryption(**encryption_kwargs))
-            QMessageBox.information(self, "Success", f"Protected PDF written:\n{out_path}")
-            if (
-                QMessageBox.question(
-                    self,
-                    "Open Folder?",
-                    "Open the output folder?",
-                    QMessageBox.Yes | QMessageBox.No,
-                )
-                == QMessageBox.Yes
-            ):
-                reveal_in_explorer(out_path)
+    def update_queue_label(self) -> None:
+        self.queue_label.setText(f"{len(self._queue)} queued")
+        self.queue_label.setVisible(bool(self._queue))
 
-        except pikepdf.PasswordError:
-            QMessageBox.critical(
+    def closeEvent(self, event) -> None:
+        """
+        Cancel a running job and wait for it before the window closes.
+        """
+        if self._job is not None:
+            self._job.cancel()
+            QThreadPool.globalInstance().waitForDone()
+        super().closeEvent(event)
+
+    def show_batch_results(self, results: List[FileResult]) -> None:
+        """
+        Summary dialog for a batch, with the failures listed under "Details".
+        """
+        failed = [r for r in results if not r.ok and r.error_type != "Cancelled"]
+        cancelled = sum(r.error_type == "Cancelled" for r in results)
+        done = sum(r.ok for r in results)
+        skipped = sum(r.skipped for r in results)
+        box = QMessageBox(self)
+        box.setIcon(QMessageBox.Warning if failed else QMessageBox.Information)
+        box.setWindowTitle("Batch cancelled" if cancelled else "Batch finished")
+        box.setText(
+            f"Protected {done} of {len(results)} file(s)."
+            + (f" {skipped} unchanged, skipped." if skipped else "")
+            + (f" {len(failed)} failed." if failed else "")
+            + (f" {cancelled} cancelled." if cancelled else "")
+        )
+        if failed:
+            box.setDetailedText("\n".join(f"{r.src}: {r.error}" for r in failed))
+        box.setStandardButtons(QMessageBox.Ok)
+        box.exec()
+        if done and (
+            QMessageBox.question(
                 self,
-                "Error",
-                "This PDF is already encrypted and requires a password to open.",
+                "Open Folder?",
+                "Open the output folder?",
+                QMessageBox.Yes | QMessageBox.No,
             )
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to save protected PDF:\n{e}")
+            == QMessageBox.Yes
+        ):
+            reveal_in_explorer(next(r.out for r in results if r.ok))
 
 
-def main() -> None:
+def main(forward: bool = True) -> None:
     """
-    Entry point. Accepts an optional first CLI argument as the initial PDF path
-    (useful when launching via a .bat with drag & drop).
+    Entry point. Accepts optional CLI arguments as the initial PDF path(s) or
+    folder (useful when launching via a .bat with drag & drop); several
+    arguments open in batch mode. If a window is already open, the paths are
+    handed to it instead (unless --new-instance is given); lockpdf_instance.py
+    has already tried that when it calls us with forward=False.
     """
-    initial = sys.argv[1] if len(sys.argv) >= 2 else None
+    args = [a for a in sys.argv[1:] if a != NEW_INSTANCE_FLAG]
+    single_instance = NEW_INSTANCE_FLAG not in sys.argv[1:]
+    if single_instance and forward and forward_paths(args):
+        sys.exit(0)
+
+    initial = "; ".join(args) if args else None
     app = QApplication(sys.argv)
     w = Main(initial_pdf=initial)
+    if single_instance:
+        server = InstanceServer(w)
+        server.paths_received.connect(w.enqueue_paths)
+        server.listen()  # If this fails the window still works, just without forwarding
     w.resize(740, 260)
     w.show()
     sys.exit(app.exec())
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Needed for worker processes in frozen (PyInstaller) builds
     main()
@@ -0,0 +1,130 @@
+"""
+lockpdf_instance.py — Single-instance launcher for the PDF Locker GUI.
+
+Run_PDF_Locker.bat starts this script instead of lockpdf_gui_qt.py. If a
+PDF Locker window is already open, the dropped paths are sent to it over a
+local socket (QLocalSocket: a named pipe on Windows, a Unix socket
+elsewhere) and this process exits straight away, without importing
+QtWidgets or pikepdf or building a window. Otherwise the GUI starts as
+usual and listens for later launches.
+
+Only QtCore and QtNetwork are imported here, so forwarding is fast.
+"""
+
+import os
+import sys
+import json
+import getpass
+import multiprocessing
+from typing import List, Optional
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+
+
+CONNECT_TIMEOUT_MS = 500  # No answer within this -> no instance is running
+NEW_INSTANCE_FLAG = "--new-instance"  # Always open a separate window
+
+
+def server_name() -> str:
+    """
+    Per-user socket name, so users sharing a machine get their own instance.
+    """
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "default"
+    return f"pdf-locker-{user}"
+
+
+def forward_paths(paths: List[str], timeout_ms: int = CONNECT_TIMEOUT_MS) -> bool:
+    """
+    Send paths to a running instance. Returns False if none is listening.
+    Paths are made absolute first, since the running instance may have a
+    different working directory.
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(server_name())
+    if not socket.waitForConnected(timeout_ms):
+        return False
+    payload = json.dumps([os.path.abspath(p) for p in paths]).encode("utf-8")
+    socket.write(payload)
+    ok = socket.waitForBytesWritten(timeout_ms) or socket.bytesToWrite() == 0
+    socket.disconnectFromServer()
+    if socket.state() != QLocalSocket.UnconnectedState:
+        socket.waitForDisconnected(timeout_ms)
+    return ok
+
+
+class InstanceServer(QObject):
+    """
+    Accepts paths forwarded by later launches and emits them on the GUI
+    thread. A message is the JSON list of paths; the sender closing the
+    connection marks the end of it.
+    """
+
+    paths_received = Signal(list)  # List[str]; an empty list just asks to raise the window
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._server = QLocalServer(self)
+        # Forwarded paths get encrypted with this user's passwords; other accounts must not queue files
+        self._server.setSocketOptions(QLocalServer.UserAccessOption)
+        self._server.newConnection.connect(self._accept)
+
+    def listen(self) -> bool:
+        """
+        Start listening, unless another window already answers on our name
+        (two launches at the same moment both find no instance to forward
+        to). Only then is a socket file left behind by a crashed instance
+        removed. Returns False if the name is taken.
+        """
+        name = server_name()
+        # Probe first: with UserAccessOption, Qt on Unix binds a temporary
+        # socket and renames it over the name, so listen() alone would
+        # silently take over a live instance's socket.
+        probe = QLocalSocket()
+        probe.connectToServer(name)
+        if probe.waitForConnected(CONNECT_TIMEOUT_MS):
+            probe.disconnectFromServer()  # An empty message; the owner ignores it
+            return False
+        QLocalServer.removeServer(name)
+        return self._server.listen(name)
+
+    def close(self) -> None:
+        self._server.close()
+
+    def _accept(self) -> None:
+        while self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            buffer = bytearray()
+            socket.readyRead.connect(lambda s=socket, b=buffer: b.extend(bytes(s.readAll())))
+            socket.disconnected.connect(lambda s=socket, b=buffer: self._finish(s, b))
+
+    def _finish(self, socket: QLocalSocket, buffer: bytearray) -> None:
+        buffer.extend(bytes(socket.readAll()))
+        socket.deleteLater()
+        try:
+            paths = json.loads(buffer.decode("utf-8"))
+        except ValueError:
+            return  # Not one of ours; ignore
+        if isinstance(paths, list):
+            self.paths_received.emit([str(p) for p in paths])
+
+
+def main() -> None:
+    """
+    Forward the arguments to a running instance, or start the GUI.
+    """
+    args = sys.argv[1:]
+    if NEW_INSTANCE_FLAG not in args and forward_paths(args):
+        sys.exit(0)
+
+    import lockpdf_gui_qt  # Heavy imports (QtWidgets, pikepdf) only when a window is needed
+
+    lockpdf_gui_qt.main(forward=False)  # Forwarding was already tried above
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Needed for worker processes in frozen (PyInstaller) builds
+    main()